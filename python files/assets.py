@@ -0,0 +1,106 @@
+# assets.py
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+LOADER_THREADS = 4
+
+
+class AssetManager:
+    """
+    Runs slow setup jobs (font lookups, cutting the world map, ...) on a
+    worker pool, and tracks their progress for the splash screen:
+
+        assets.submit("world map", prepare_world_map, required=True)
+
+    Finished results are cached by name, so submitting the same job again is
+    free. Surfaces are converted to the display format on the main thread,
+    because convert() needs the display.
+    """
+
+    def __init__(self, threads=LOADER_THREADS):
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="assets")
+        self._cache = {}     # key -> finished asset
+        self._pending = {}   # key -> (future, kind, required)
+        self._failed = {}    # key -> exception
+        self._required = set()
+
+    # ------------- queueing -------------
+
+    def _queue(self, key, kind, required, fn, *args):
+        if key in self._cache or key in self._pending or key in self._failed:
+            if required:
+                self._required.add(key)
+            return key
+        future = self._pool.submit(fn, *args)
+        self._pending[key] = (future, kind, required)
+        if required:
+            self._required.add(key)
+        return key
+
+    def submit(self, name, fn, *args, required=False):
+        """Run any slow setup job (e.g. splitting the world map) on the pool."""
+        return self._queue(name, "task", required, fn, *args)
+
+    # ------------- main thread -------------
+
+    def poll(self):
+        """Collect finished jobs. Call once per frame from the main thread."""
+        for key, (future, kind, _required) in list(self._pending.items()):
+            if not future.done():
+                continue
+            del self._pending[key]
+            try:
+                asset = future.result()
+            except Exception as e:
+                print(f"Could not load asset {key}: {e}")
+                self._failed[key] = e
+                continue
+            self._cache[key] = self._finish(asset, kind)
+
+    def _finish(self, asset, kind):
+        if pygame.display.get_surface() is None:
+            return asset
+        if kind == "image":
+            return asset.convert()
+        if kind == "alpha":
+            return asset.convert_alpha()
+        return asset
+
+    def get(self, key, default=None):
+        """A finished asset, or default if it isn't loaded (yet)."""
+        return self._cache.get(key, default)
+
+    def image(self, path, alpha=False):
+        """Converted image for path, loaded right now (on this thread) the first time."""
+        key = (path, alpha)
+        surface = self._cache.get(key)
+        if surface is None:
+            surface = self._finish(pygame.image.load(path), "alpha" if alpha else "image")
+            self._cache[key] = surface
+        return surface
+
+    # ------------- progress -------------
+
+    def progress(self, required_only=True) -> float:
+        """Fraction (0..1) of queued jobs that are finished (or failed)."""
+        if required_only:
+            keys = self._required
+        else:
+            keys = set(self._cache) | set(self._pending) | set(self._failed)
+        if not keys:
+            return 1.0
+        done = sum(1 for k in keys if k not in self._pending)
+        return done / len(keys)
+
+    def ready(self) -> bool:
+        """True once every required job is finished (or failed)."""
+        return not any(k in self._pending for k in self._required)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Shared manager used by the whole game
+assets = AssetManager()
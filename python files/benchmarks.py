@@ -0,0 +1,636 @@
+# benchmarks.py
+"""
+Small performance benchmarks. Run from the "python files" folder:
+
+    python benchmarks.py grid
+    python benchmarks.py items
+    python benchmarks.py save
+    python benchmarks.py autosave
+    python benchmarks.py itemdb
+    python benchmarks.py sim
+    python benchmarks.py entities
+    python benchmarks.py spatial
+    python benchmarks.py sprites
+    python benchmarks.py layers
+    python benchmarks.py startup
+    python benchmarks.py imports
+
+Runs without a window (SDL dummy video driver) unless you set SDL_VIDEODRIVER yourself.
+"""
+
+import argparse
+import gc
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import uuid
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+
+def _timeit(fn, frames):
+    """Call fn() frames times, return average milliseconds per call."""
+    start = time.perf_counter()
+    for _ in range(frames):
+        fn()
+    return (time.perf_counter() - start) * 1000 / frames
+
+
+# -----------------------------
+# Grid: per-line drawing vs cached layer blit
+# -----------------------------
+GRID_RESOLUTIONS = [(1280, 720), (1920, 1080), (2560, 1440), (3840, 2160)]
+
+
+def bench_grid(frames=300):
+    from grid import Grid
+    from camera import Camera
+
+    pygame.init()
+    print(f"{'resolution':>12} {'lines ms':>10} {'layer ms':>10} {'speedup':>8}")
+
+    for width, height in GRID_RESOLUTIONS:
+        screen = pygame.display.set_mode((width, height))
+        camera = Camera(screen, 4000, 4000)
+        grid = Grid()
+
+        # Scroll a little every frame so both paths see a moving camera
+        step = [0]
+
+        def scroll():
+            step[0] += 1
+            camera.offset_x = step[0] * 3 % 400
+            camera.offset_y = step[0] * 2 % 400
+
+        def old_path():
+            scroll()
+            grid.draw_lines(screen, camera)
+
+        def new_path():
+            scroll()
+            grid.draw(screen, camera)
+
+        grid.draw(screen, camera)  # build the layer outside the timed loop
+        old_ms = _timeit(old_path, frames)
+        new_ms = _timeit(new_path, frames)
+        print(f"{width:>6}x{height:<5} {old_ms:>10.3f} {new_ms:>10.3f} {old_ms / new_ms:>7.1f}x")
+
+    pygame.quit()
+
+
+# -----------------------------
+# Startup: process start -> first menu frame
+# -----------------------------
+# Starts the game like main.py does, but quits after the first menu frame
+FIRST_FRAME_MARKER = "LASAIRE_FIRST_MENU_FRAME"
+FIRST_FRAME_SCRIPT = f"""
+import main
+
+def first_frame():
+    print({FIRST_FRAME_MARKER!r}, flush=True)
+    main.quit_game()
+
+main.main(first_frame=first_frame)
+"""
+
+
+def bench_startup(runs=5):
+    env = dict(os.environ)
+    env.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, "-c", FIRST_FRAME_SCRIPT],
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        elapsed = None
+        for line in proc.stdout:
+            if line.strip() == FIRST_FRAME_MARKER:
+                elapsed = (time.perf_counter() - start) * 1000
+                break
+        proc.wait()
+        if elapsed is None:
+            print("The game exited without drawing a menu frame")
+            return
+        times.append(elapsed)
+
+    print(f"first menu frame: median {statistics.median(times):.0f} ms, "
+          f"min {min(times):.0f} ms, max {max(times):.0f} ms ({runs} runs)")
+
+
+# -----------------------------
+# Imports: what loads before the first menu frame, and what it costs
+# -----------------------------
+# Our modules allowed to be imported before the menu's first frame.
+# world_map is imported by the asset worker that cuts the map during the splash.
+MENU_MODULES = {"main", "graphs", "text_cache", "assets", "transitions", "world_map"}
+
+
+def _parse_importtime(stderr):
+    """[(module, self_us, cumulative_us)] from python -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def bench_imports(top=15):
+    env = dict(os.environ)
+    env.setdefault("SDL_AUDIODRIVER", "dummy")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", FIRST_FRAME_SCRIPT],
+        env=env, capture_output=True, text=True,
+    )
+    rows = _parse_importtime(proc.stderr)
+    ours = {os.path.splitext(f)[0] for f in os.listdir(".") if f.endswith(".py")}
+
+    total = sum(self_us for _name, self_us, _cum in rows)
+    print(f"{len(rows)} modules, {total / 1000:.0f} ms of imports before the first menu frame")
+    print(f"{'module':<40} {'self ms':>8} {'cumul ms':>9}")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda r: -r[1])[:top]:
+        print(f"{name:<40} {self_us / 1000:>8.1f} {cumulative_us / 1000:>9.1f}")
+
+    print("our modules:")
+    loaded = [row for row in rows if row[0] in ours]
+    for name, self_us, cumulative_us in loaded:
+        print(f"  {name:<38} {self_us / 1000:>8.1f} {cumulative_us / 1000:>9.1f}")
+
+    unexpected = sorted(name for name, _s, _c in loaded if name not in MENU_MODULES)
+    if unexpected:
+        print(f"REGRESSION: imported before the first menu frame: {', '.join(unexpected)}")
+        sys.exit(1)
+
+
+# -----------------------------
+# Simulation: headless ticks per second
+# -----------------------------
+def bench_sim(ticks=200_000):
+    from engine import run_headless, wander_script
+
+    stats = run_headless(wander_script(ticks))
+    print(f"{stats['ticks']} ticks in {stats['seconds']:.2f} s -> "
+          f"{stats['ticks_per_second']:.0f} ticks/s")
+
+
+# -----------------------------
+# Entities: one object per mob vs the array-backed store
+# -----------------------------
+ENTITY_COUNTS = [100, 1_000, 10_000]
+
+
+class _ObjectMob:
+    """A mob the Player way: floats on __dict__, one method call per update."""
+
+    def __init__(self, x, y, vx, vy, size):
+        self.x, self.y, self.vx, self.vy, self.size = x, y, vx, vy, size
+
+    def update(self, dt, world_width, world_height):
+        self.x += self.vx * dt
+        self.y += self.vy * dt
+        half = self.size / 2
+        if self.x < half or self.x > world_width - half:
+            self.vx = -self.vx
+            self.x = max(half, min(world_width - half, self.x))
+        if self.y < half or self.y > world_height - half:
+            self.vy = -self.vy
+            self.y = max(half, min(world_height - half, self.y))
+
+
+def bench_entities(ticks=200):
+    import numpy as np
+    from camera import Camera
+    from entities import EntityStore, spawn_slimes
+    from engine import SIM_DT, WORLD_WIDTH, WORLD_HEIGHT
+
+    camera = Camera(pygame.Surface((1280, 720)), WORLD_WIDTH, WORLD_HEIGHT)
+    print(f"{'entities':>9} {'objects us':>11} {'arrays us':>10} {'speedup':>8}   (per tick)")
+    for count in ENTITY_COUNTS:
+        rng = np.random.default_rng(0)
+        store = EntityStore()
+        spawn_slimes(store, count, WORLD_WIDTH, WORLD_HEIGHT, rng)
+        mobs = [_ObjectMob(x, y, vx, vy, s) for x, y, vx, vy, s in zip(
+            store.x.tolist(), store.y.tolist(), store.vx.tolist(), store.vy.tolist(), store.size.tolist())]
+
+        def objects():
+            for mob in mobs:
+                mob.update(SIM_DT, WORLD_WIDTH, WORLD_HEIGHT)
+            for mob in mobs:
+                camera.world_to_screen(mob.x, mob.y)
+
+        def arrays():
+            store.step(SIM_DT)
+            store.clamp_to_world(WORLD_WIDTH, WORLD_HEIGHT)
+            store.to_screen(camera)
+
+        objects_us = _timeit(objects, ticks) * 1000
+        arrays_us = _timeit(arrays, ticks) * 1000
+        print(f"{count:>9} {objects_us:>11.1f} {arrays_us:>10.1f} {objects_us / arrays_us:>7.1f}x")
+
+
+# -----------------------------
+# Spatial index: culling and proximity, all entities vs index cells
+# -----------------------------
+SPATIAL_COUNTS = [1_000, 10_000, 100_000]
+
+
+def bench_spatial(frames=200):
+    import numpy as np
+    from camera import Camera
+    from entities import EntityStore, spawn_slimes, SLIME_AGGRO_RADIUS
+    from engine import SIM_DT, WORLD_WIDTH, WORLD_HEIGHT
+
+    camera = Camera(pygame.Surface((1280, 720)), WORLD_WIDTH, WORLD_HEIGHT)
+    camera.update(WORLD_WIDTH / 2, WORLD_HEIGHT / 2)
+    cx, cy = WORLD_WIDTH / 2, WORLD_HEIGHT / 2
+    print(f"{'entities':>9} {'cull all us':>12} {'cull index us':>14} "
+          f"{'near all us':>12} {'near index us':>14} {'reindex us':>11}")
+    for count in SPATIAL_COUNTS:
+        store = EntityStore()
+        spawn_slimes(store, count, WORLD_WIDTH, WORLD_HEIGHT, np.random.default_rng(0))
+
+        def cull_all():
+            # What screen_rects did before the index: test every entity
+            sx, sy = store.to_screen(camera)
+            half = store.size / 2
+            view_w, view_h = camera.screen.get_size()
+            np.flatnonzero((sx + half > 0) & (sy + half > 0) & (sx - half < view_w) & (sy - half < view_h))
+
+        def near_all():
+            dx = store.x - cx
+            dy = store.y - cy
+            np.flatnonzero(dx * dx + dy * dy <= SLIME_AGGRO_RADIUS ** 2)
+
+        def reindex():
+            store.step(SIM_DT)
+            store.update_index()
+
+        cull_all_us = _timeit(cull_all, frames) * 1000
+        cull_index_us = _timeit(lambda: store.screen_rects(camera), frames) * 1000
+        near_all_us = _timeit(near_all, frames) * 1000
+        near_index_us = _timeit(lambda: store.within(cx, cy, SLIME_AGGRO_RADIUS), frames) * 1000
+        reindex_us = _timeit(reindex, frames) * 1000
+        print(f"{count:>9} {cull_all_us:>12.1f} {cull_index_us:>14.1f} "
+              f"{near_all_us:>12.1f} {near_index_us:>14.1f} {reindex_us:>11.1f}")
+
+
+# -----------------------------
+# Sprites: one fill per entity vs one batched blits() from the atlas
+# -----------------------------
+SPRITE_COUNTS = [1_000, 5_000, 20_000]
+
+
+def bench_sprites(frames=60):
+    import numpy as np
+    from entities import SLIME_COLORS, SLIME_SIZE
+    from sprites import SpriteBatch, build_world_atlas
+
+    pygame.init()
+    screen = pygame.display.set_mode((1280, 720))
+    atlas = build_world_atlas(35, (255, 0, 0))
+    sprites = [atlas[("slime", i)] for i in range(len(SLIME_COLORS))]
+    batch = SpriteBatch()
+
+    renderer = textures = None
+    try:
+        from pygame._sdl2.video import Window, Renderer
+        window = Window("sprites benchmark", (1280, 720), hidden=True)
+        renderer = Renderer(window)
+        textures = atlas.to_textures(renderer)
+    except Exception as e:   # no _sdl2 module, or no renderer for this video driver
+        print(f"(no SDL2 renderer: {e})")
+
+    rng = np.random.default_rng(0)
+    print(f"{'sprites':>8} {'fill ms':>8} {'blits ms':>9} {'renderer ms':>12}")
+    for count in SPRITE_COUNTS:
+        left = rng.integers(0, 1280 - SLIME_SIZE, count)
+        top = rng.integers(0, 720 - SLIME_SIZE, count)
+        looks = rng.integers(0, len(sprites), count)
+        colors = [SLIME_COLORS[i] for i in looks.tolist()]
+
+        def fill():
+            for l, t, c in zip(left.tolist(), top.tolist(), colors):
+                screen.fill(c, (l, t, SLIME_SIZE, SLIME_SIZE))
+
+        def blits():
+            batch.add_many(sprites, looks, left, top)
+            batch.draw(screen)
+
+        def gpu():
+            batch.add_many(sprites, looks, left, top)
+            batch.draw_gpu(renderer, textures)
+            renderer.present()
+
+        fill_ms = _timeit(fill, frames)
+        blits_ms = _timeit(blits, frames)
+        gpu_ms = f"{_timeit(gpu, frames):>12.2f}" if renderer is not None else f"{'-':>12}"
+        print(f"{count:>8} {fill_ms:>8.2f} {blits_ms:>9.2f} {gpu_ms}")
+
+
+# -----------------------------
+# Render layers: redraw every layer vs compose the clean ones from cache
+# -----------------------------
+def bench_layers(frames=120):
+    from engine import Simulation, KeyState
+    from grid import Grid
+    from render import Backdrop, RenderGraph, RenderLayer
+    from sprites import SpriteBatch, build_world_atlas
+    from world_map import ChunkedMap, MAP_PATH, WORLD_WIDTH, WORLD_HEIGHT
+
+    pygame.init()
+    screen = pygame.display.set_mode((1280, 720))
+    sim = Simulation(screen)
+    camera, player = sim.camera, sim.player
+    atlas = build_world_atlas(player.size, player.color)
+    slime_sprites = [atlas[("slime", i)] for i in range(3)]
+    world_map = ChunkedMap.open(MAP_PATH, WORLD_WIDTH, WORLD_HEIGHT)
+    grid = Grid()
+
+    def view_state():
+        return camera.offset_x, camera.offset_y
+
+    def draw_map(surface):
+        if world_map is None:
+            surface.fill((30, 30, 40))
+            return []
+        world_map.update(camera)
+        return world_map.draw(surface, camera)
+
+    def graph(cached, menu_open):
+        batch = SpriteBatch()
+        backdrop = Backdrop(lambda: menu_open)
+
+        def draw_entities(surface):
+            sim.slimes.draw(batch, camera, slime_sprites)
+            player.draw(batch, camera, atlas["player"])
+            return batch.draw(surface)
+
+        return RenderGraph([
+            RenderLayer("map", draw_map, state=view_state if cached else None),
+            RenderLayer("grid", lambda surface: grid.draw(surface, camera),
+                        state=view_state if cached else None),
+            RenderLayer("entities", draw_entities,
+                        state=(lambda: (sim.version, view_state())) if cached else None),
+            RenderLayer("backdrop", backdrop.draw, state=backdrop.state if cached else None),
+        ])
+
+    # Moving paces left and right, so both runs stream the same map chunks
+    left, right, still = KeyState([pygame.K_LEFT]), KeyState([pygame.K_RIGHT]), KeyState()
+    scenarios = [
+        ("moving", [right] * 30 + [left] * 30, False),
+        ("camera still", [still], False),
+        ("paused (menu)", [still], True),
+    ]
+    print(f"{'scenario':>13} {'redraw ms':>10} {'cached ms':>10}")
+    for name, script, pause in scenarios:
+        results = []
+        for cached in (False, True):
+            layers = graph(cached, menu_open=pause)
+            tick = [0]
+
+            def frame():
+                sim.step(script[tick[0] % len(script)], paused=pause)
+                tick[0] += 1
+                camera.update(player.x, player.y)
+                layers.draw(screen)
+
+            for _ in script:   # warm up: load the chunks, build caches
+                frame()
+            results.append(_timeit(frame, frames))
+        print(f"{name:>13} {results[0]:>10.2f} {results[1]:>10.2f}")
+
+
+# -----------------------------
+# Items: per-field copies vs shared templates
+# -----------------------------
+class LegacyItem:
+    """The Item class before templates: every field copied into a __dict__."""
+
+    def __init__(self, template_id, unique_id, name, category, description="",
+                 damage=0, heal_amount=0, value=0, stackable=True, max_stack=99):
+        self.template_id = template_id
+        self.unique_id = unique_id
+        self.name = name
+        self.category = category
+        self.description = description
+        self.damage = damage
+        self.heal_amount = heal_amount
+        self.value = value
+        self.stackable = stackable
+        self.max_stack = max_stack
+
+
+def _legacy_create_item(item_id):
+    from items import ITEM_DEFS
+
+    data = ITEM_DEFS[item_id]
+    return LegacyItem(template_id=item_id, unique_id=str(uuid.uuid4()), **data)
+
+
+def _measure_items(factory, count):
+    """(seconds, bytes) to create and hold count items."""
+    ids = ["slime_goo", "small_hp_potion", "rusty_sword", "stick"]
+
+    # Timed pass without tracemalloc, it slows allocation down a lot
+    gc.collect()
+    start = time.perf_counter()
+    items = [factory(ids[i % len(ids)]) for i in range(count)]
+    elapsed = time.perf_counter() - start
+    del items
+
+    gc.collect()
+    tracemalloc.start()
+    items = [factory(ids[i % len(ids)]) for i in range(count)]
+    size, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    return elapsed, size
+
+
+def bench_items(count=1_000_000):
+    from items import create_item
+
+    print(f"{'':>10} {'seconds':>9} {'MB':>9} {'bytes/item':>11}")
+    for label, factory in (("old", _legacy_create_item), ("new", create_item)):
+        elapsed, size = _measure_items(factory, count)
+        print(f"{label:>10} {elapsed:>9.2f} {size / 1e6:>9.1f} {size / count:>11.0f}")
+
+
+# -----------------------------
+# Save / load: binary save files for big inventories
+# -----------------------------
+SAVE_SIZES = [1_000, 10_000, 100_000]
+
+
+def _big_player(stacks):
+    from player import Player
+    from items import ItemStack, create_item
+
+    player = Player(1234.5, 678.9)
+    player.inventory.max_slots = stacks
+    ids = ["slime_goo", "small_hp_potion", "rusty_sword", "stick"]
+    # Every stack its own item instance, the worst case for the save
+    items = (create_item(ids[i % len(ids)]) for i in range(stacks))
+    player.inventory.restore(
+        ItemStack(item, 1 + i % item.max_stack) for i, item in enumerate(items)
+    )
+    player.equipped_weapon = next(s.item for s in player.inventory if s.item.category == "weapon")
+    return player
+
+
+def bench_save(runs=5):
+    import tempfile
+    from savegame import encode_save, pack_save, save_game, load_save
+
+    path = os.path.join(tempfile.mkdtemp(), "bench.sav")
+    print(f"{'stacks':>8} {'mode':>6} {'encode ms':>10} {'save ms':>9} {'load ms':>9} {'KB':>8}")
+    for stacks in SAVE_SIZES:
+        player = _big_player(stacks)
+        for compress in (False, True):
+            encode_ms = min(_timeit(lambda: encode_save(player), 1) for _ in range(runs))
+            save_ms = min(_timeit(lambda: save_game(path, player, compress=compress), 1)
+                          for _ in range(runs))
+            load_ms = min(_timeit(lambda: load_save(path), 1) for _ in range(runs))
+            size = len(pack_save(encode_save(player), compress))
+            mode = "zlib" if compress else "raw"
+            print(f"{stacks:>8} {mode:>6} {encode_ms:>10.2f} {save_ms:>9.2f} "
+                  f"{load_ms:>9.2f} {size / 1024:>8.0f}")
+    os.remove(path)
+
+
+def bench_autosave(frames=600):
+    import tempfile
+    from savegame import saver, encode_save, take_snapshot
+    from journal import Autosave
+
+    path = os.path.join(tempfile.mkdtemp(), "bench.sav")
+    # encode: a full save, on the save thread; snapshot: its main thread part
+    print(f"{'stacks':>8} {'encode ms':>10} {'snapshot ms':>12} {'tick avg us':>12} {'tick max us':>12}")
+    for stacks in SAVE_SIZES:
+        player = _big_player(stacks)
+        full_ms = _timeit(lambda: encode_save(player), 3)
+        snapshot_ms = _timeit(lambda: take_snapshot(player), 3)
+
+        autosave = Autosave(player, {}, path)
+        saver.wait()
+        times = []
+        for frame in range(frames):
+            player.x += 1.5
+            if frame % 10 == 0:
+                player.add_item("slime_goo", 1)
+            start = time.perf_counter()
+            autosave.tick(1 / 60)
+            times.append((time.perf_counter() - start) * 1e6)
+        autosave.close()
+        saver.wait()
+        print(f"{stacks:>8} {full_ms:>10.2f} {snapshot_ms:>12.2f} "
+              f"{statistics.mean(times):>12.1f} {max(times):>12.1f}")
+
+
+# -----------------------------
+# Item definitions: dict of every template vs mmap'd item database
+# -----------------------------
+def _synthetic_defs(count):
+    categories = ["weapon", "consumable", "material", "quest"]
+    return {
+        f"item_{i:06d}": {
+            "name": f"Item {i}",
+            "category": categories[i % len(categories)],
+            "description": f"Generated test item number {i}. " * 3,
+            "damage": i % 50,
+            "heal_amount": i % 30,
+            "value": i % 1000,
+            "stackable": i % 3 != 0,
+            "max_stack": 99 if i % 3 else 1,
+        }
+        for i in range(count)
+    }
+
+
+def bench_itemdb(count=50_000, lookups=10_000):
+    import random
+    import tempfile
+    from items import ItemTemplate
+    from itemdb import ItemDB, compile_item_db
+
+    defs = _synthetic_defs(count)
+    path = os.path.join(tempfile.mkdtemp(), "items.idb")
+    compile_item_db(defs, path)
+    rng = random.Random(0)
+    # Mostly a small working set, like a real session
+    hot = [f"item_{rng.randrange(count):06d}" for _ in range(200)]
+    keys = [rng.choice(hot) if rng.random() < 0.9 else f"item_{rng.randrange(count):06d}"
+            for _ in range(lookups)]
+
+    def open_dict():
+        return {key: ItemTemplate(key, **data) for key, data in defs.items()}
+
+    def open_db():
+        return ItemDB(path)
+
+    print(f"{count} definitions, {lookups} lookups")
+    print(f"{'':>10} {'open ms':>9} {'lookups ms':>11} {'MB':>7}")
+    for label, opener in (("dict", open_dict), ("mmap db", open_db)):
+        gc.collect()
+        start = time.perf_counter()
+        catalog = opener()
+        open_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        for key in keys:
+            catalog.get(key)
+        lookup_ms = (time.perf_counter() - start) * 1000
+        del catalog
+
+        gc.collect()
+        tracemalloc.start()
+        catalog = opener()
+        for key in keys:
+            catalog.get(key)
+        size, _peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del catalog
+        print(f"{label:>10} {open_ms:>9.2f} {lookup_ms:>11.2f} {size / 1e6:>7.2f}")
+    os.remove(path)
+
+
+BENCHMARKS = {
+    "autosave": bench_autosave,
+    "entities": bench_entities,
+    "imports": bench_imports,
+    "itemdb": bench_itemdb,
+    "save": bench_save,
+    "items": bench_items,
+    "grid": bench_grid,
+    "sim": bench_sim,
+    "spatial": bench_spatial,
+    "sprites": bench_sprites,
+    "layers": bench_layers,
+    "startup": bench_startup,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lasaire benchmarks")
+    parser.add_argument("name", choices=sorted(BENCHMARKS) + ["all"])
+    args = parser.parse_args()
+
+    names = sorted(BENCHMARKS) if args.name == "all" else [args.name]
+    for name in names:
+        print(f"=== {name} ===")
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
 # camera.py
+import pygame
+
 
 class Camera:
     def __init__(self, screen, world_width, world_height):
@@ -29,3 +31,14 @@ class Camera:
         Use this for any object you draw.
         """
         return x - self.offset_x, y - self.offset_y
+
+    def viewport(self, margin=0):
+        """
+        The part of the world that is on screen, as a world-space Rect,
+        grown by margin pixels on every side. Use it to skip off-screen things.
+        """
+        screen_w, screen_h = self.screen.get_size()
+        return pygame.Rect(
+            int(self.offset_x) - margin, int(self.offset_y) - margin,
+            screen_w + 2 * margin, screen_h + 2 * margin,
+        )
@@ -0,0 +1,46 @@
+# dirty_rects.py
+
+import pygame
+
+
+class DirtyRects:
+    """
+    Collects the screen regions that changed this frame and presents only those.
+
+    Every drawable's draw() returns a list of rects it changed
+    (an empty list when it looks the same as last frame).
+    Pass those lists to add(), then call present() once per frame.
+    """
+
+    def __init__(self, screen, enabled=True):
+        self.screen = screen
+        self.enabled = enabled
+        self.rects: list[pygame.Rect] = []
+        self.full = True  # first frame always needs a full present
+
+    def add(self, rects):
+        if rects:
+            self.rects.extend(rects)
+
+    def invalidate(self):
+        """Force a full-screen present on the next frame (resize, settings change...)."""
+        self.full = True
+
+    def present(self) -> bool:
+        """
+        Push this frame to the display.
+        Returns False if nothing changed and presenting was skipped.
+        """
+        presented = True
+        if not self.enabled or self.full:
+            pygame.display.flip()
+        elif self.rects:
+            screen_rect = self.screen.get_rect()
+            rects = [r.clip(screen_rect) for r in self.rects]
+            pygame.display.update([r for r in rects if r.width and r.height])
+        else:
+            presented = False
+
+        self.rects = []
+        self.full = False
+        return presented
@@ -0,0 +1,281 @@
+# engine.py
+"""
+Game logic without rendering.
+
+start_game() drives a Simulation from the keyboard; run_headless() drives
+the same Simulation from scripted or recorded input, with no window and no
+frame cap, so it can be soak-tested and benchmarked on machines without a GPU:
+
+    python engine.py --ticks 200000
+    python engine.py --replay recording.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import time
+
+import numpy as np
+import pygame
+
+from camera import Camera
+from entities import EntityStore, spawn_slimes, SLIME_AGGRO_RADIUS, SLIME_CHASE_SPEED
+from player import Player
+from world_map import WORLD_WIDTH, WORLD_HEIGHT
+
+# SIMULATION SETTINGS
+
+# Simulation runs at a fixed rate, independent of how fast we render.
+SIM_HZ = 120
+SIM_DT = 1.0 / SIM_HZ
+MAX_SIM_STEPS = 8   # most catch-up steps per frame before we drop time
+
+# Camera view size used when there is no screen
+HEADLESS_VIEW_SIZE = (1280, 720)
+
+# The keys Player.handle_input looks at; these are what recordings store
+MOVE_KEYS = (
+    pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN,
+    pygame.K_a, pygame.K_d, pygame.K_w, pygame.K_s,
+)
+
+SLIME_COUNT = 500   # slimes scattered over the world at the start
+AGGRO_TICKS = SIM_HZ // 10   # how often slimes look for the player (ticks)
+
+STARTING_ITEMS = [
+    ("rusty_sword", 2),
+    ("small_hp_potion", 200),
+    ("slime_goo", 5),
+]
+
+
+class Simulation:
+    """Player, mobs, camera and inventory logic, advanced one fixed step at a time."""
+
+    def __init__(self, view, world_width=WORLD_WIDTH, world_height=WORLD_HEIGHT,
+                 slime_count=SLIME_COUNT, seed=0):
+        """
+        view: anything with get_size() the camera can center on -
+              the display Surface in game, a plain pygame.Surface headless.
+        seed: for the mobs' random wandering, so headless runs repeat exactly.
+        """
+        self.world_width = world_width
+        self.world_height = world_height
+        self.camera = Camera(view, world_width, world_height)
+
+        # Start player in the center of the world
+        self.player = Player(world_width / 2, world_height / 2, speed=300)
+        # Unpaused steps only: recordings skip paused ticks, and aggro timing
+        # counts on this, so a replay stays in step with the live game
+        self.tick_count = 0
+        # Bumped by every step that can move something, so renderers can
+        # tell a frozen world from a moving one
+        self.version = 0
+        self._was_paused = False
+
+        self.rng = np.random.default_rng(seed)
+        self.slimes = EntityStore()
+        spawn_slimes(self.slimes, slime_count, world_width, world_height, self.rng)
+
+    def give_starting_items(self):
+        """Some starting items so you can see the inventory working."""
+        for item_id, amount in STARTING_ITEMS:
+            self.player.add_item(item_id, amount)
+
+    def step(self, keys, dt=SIM_DT, paused=False):
+        """Advance the world by one fixed step."""
+        player = self.player
+        player.store_previous_position()
+        slimes = self.slimes
+        if not paused:
+            player.handle_input(keys, dt)
+            player.clamp_to_world(self.world_width, self.world_height)
+            slimes.wander(self.rng, dt)
+            if self.tick_count % AGGRO_TICKS == 0:
+                # Only the slimes in the cells around the player are looked at
+                near = slimes.within(player.x, player.y, SLIME_AGGRO_RADIUS)
+                if len(near):
+                    slimes.steer_towards(near, player.x, player.y, SLIME_CHASE_SPEED)
+            slimes.step(dt)
+            slimes.clamp_to_world(self.world_width, self.world_height)
+            self.tick_count += 1
+        else:
+            slimes.step(0.0)   # keeps prev == current, so nothing jitters
+        if not (paused and self._was_paused):
+            # The first paused step still snaps prev to current
+            self.version += 1
+        self._was_paused = paused
+
+    def apply_action(self, action):
+        """
+        Run one scripted inventory action:
+          ("add_item", item_id, amount)
+          ("remove_item", item_id, amount)
+          ("use", item_id)     - use/equip the first stack of that item
+          ("apply", [(op, item_id, amount), ...])  - one atomic inventory batch
+        """
+        name, *args = action
+        player = self.player
+        if name == "add_item":
+            player.add_item(*args)
+        elif name == "remove_item":
+            player.remove_item(*args)
+        elif name == "apply":
+            player.inventory.apply(args[0])
+        elif name == "use":
+            stacks = player.inventory.stacks_for_template(args[0])
+            if stacks:
+                player.use_item(stacks[0].item)
+        else:
+            raise ValueError(f"Unknown action: {name}")
+
+
+# -----------------------------
+# Input sources
+# -----------------------------
+class KeyState:
+    """Stands in for pygame.key.get_pressed(): keys[pygame.K_a] -> bool."""
+
+    def __init__(self, pressed=()):
+        self.pressed = frozenset(pressed)
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+
+class InputRecording:
+    """
+    Movement keys per simulation tick, stored run-length encoded:
+    [[tick_count, [key, ...]], ...]
+    """
+
+    def __init__(self, runs=None, actions=None):
+        self.runs: list[list] = runs or []
+        self.actions: dict[int, list] = actions or {}   # tick -> [action, ...]
+
+    def record(self, keys):
+        """Store the movement keys held for one tick (keys: get_pressed() or KeyState)."""
+        pressed = [k for k in MOVE_KEYS if keys[k]]
+        if self.runs and self.runs[-1][1] == pressed:
+            self.runs[-1][0] += 1
+        else:
+            self.runs.append([1, pressed])
+
+    def __len__(self):
+        return sum(count for count, _ in self.runs)
+
+    def ticks(self):
+        """Yield (KeyState, [actions]) for every recorded tick."""
+        tick = 0
+        for count, pressed in self.runs:
+            state = KeyState(pressed)
+            for _ in range(count):
+                yield state, self.actions.get(tick, ())
+                tick += 1
+
+    def save(self, path):
+        data = {
+            "sim_hz": SIM_HZ,
+            "runs": self.runs,
+            "actions": {str(t): a for t, a in self.actions.items()},
+        }
+        with open(path, "w") as f:
+            json.dump(data, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        actions = {int(t): [tuple(a) for a in acts] for t, acts in data.get("actions", {}).items()}
+        return cls(data["runs"], actions)
+
+
+def wander_script(ticks, seed=0, hold=(30, 240), action_every=600):
+    """
+    Deterministic soak-test input: random movement keys held for a while,
+    plus a pickup / use / drop every action_every ticks.
+    """
+    rng = random.Random(seed)
+    recording = InputRecording()
+    directions = [
+        (), (pygame.K_LEFT,), (pygame.K_RIGHT,), (pygame.K_UP,), (pygame.K_DOWN,),
+        (pygame.K_a, pygame.K_w), (pygame.K_d, pygame.K_s),
+    ]
+    cycle = [
+        ("add_item", "slime_goo", 3),
+        ("add_item", "small_hp_potion", 1),
+        ("use", "small_hp_potion"),
+        ("remove_item", "slime_goo", 2),
+    ]
+
+    tick = 0
+    while tick < ticks:
+        count = min(ticks - tick, rng.randint(*hold))
+        recording.runs.append([count, list(rng.choice(directions))])
+        tick += count
+
+    for i, t in enumerate(range(action_every, ticks, action_every)):
+        recording.actions[t] = [cycle[i % len(cycle)]]
+    return recording
+
+
+# -----------------------------
+# Headless runner
+# -----------------------------
+def run_headless(recording, view_size=HEADLESS_VIEW_SIZE, starting_items=True, quiet=True):
+    """
+    Run the simulation as fast as possible over a recording. No window needed.
+    Returns a stats dict including ticks_per_second.
+    """
+    view = pygame.Surface(view_size)   # only used for its size
+    sim = Simulation(view)
+    if starting_items:
+        sim.give_starting_items()
+
+    with contextlib.ExitStack() as stack:
+        if quiet:
+            # Player prints on every use/equip; keep the soak output readable
+            devnull = stack.enter_context(open(os.devnull, "w"))
+            stack.enter_context(contextlib.redirect_stdout(devnull))
+
+        start = time.perf_counter()
+        for keys, actions in recording.ticks():
+            for action in actions:
+                sim.apply_action(action)
+            sim.step(keys)
+            sim.camera.update(sim.player.x, sim.player.y)
+        elapsed = time.perf_counter() - start
+
+    return {
+        "ticks": sim.tick_count,
+        "seconds": elapsed,
+        "ticks_per_second": sim.tick_count / elapsed if elapsed > 0 else float("inf"),
+        "simulated_seconds": sim.tick_count * SIM_DT,
+        "player_pos": (round(sim.player.x, 3), round(sim.player.y, 3)),
+        "stacks": len(sim.player.inventory),
+        "slimes": len(sim.slimes),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the game simulation headless")
+    parser.add_argument("--ticks", type=int, default=100_000, help="ticks of scripted input")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--replay", help="recording saved from the game instead of a script")
+    args = parser.parse_args()
+
+    if args.replay:
+        recording = InputRecording.load(args.replay)
+    else:
+        recording = wander_script(args.ticks, seed=args.seed)
+
+    stats = run_headless(recording)
+    print(f"{stats['ticks']} ticks ({stats['simulated_seconds']:.0f} s of game time) "
+          f"in {stats['seconds']:.2f} s -> {stats['ticks_per_second']:.0f} ticks/s")
+    print(f"final player position {stats['player_pos']}, {stats['stacks']} stacks")
+
+
+if __name__ == "__main__":
+    main()
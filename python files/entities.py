@@ -0,0 +1,323 @@
+# entities.py
+"""
+Array-backed entities (slimes and other mobs).
+
+The Player is one object with its own methods. Mobs come by the hundreds
+or thousands, so EntityStore keeps every field in a NumPy array, one row per
+entity, and moves / clamps / transforms all of them with a few array
+operations per tick instead of a Python call per entity.
+
+Rows are kept packed: despawning moves the last row into the hole. Use the
+stable entity ids (not row numbers) to refer to an entity over time.
+
+Every store also files its rows in a SpatialGrid on the tile grid.
+The index is brought up to date lazily, by the first query after the
+entities moved, and then only re-files the ones that crossed into another
+cell. Drawing and proximity queries look at the cells around the area they
+need instead of at every entity in the world.
+"""
+
+import numpy as np
+
+from spatial import SpatialGrid
+
+INITIAL_CAPACITY = 64
+
+SLIME_SIZE = 24
+SLIME_HP = 10
+SLIME_SPEED = 60.0          # pixels per second
+SLIME_TURN_CHANCE = 0.5     # chance per second that a slime picks a new direction
+SLIME_COLORS = [(70, 200, 90), (50, 170, 120), (110, 220, 70)]
+SLIME_AGGRO_RADIUS = 160.0  # slimes this close to the player go after it
+SLIME_CHASE_SPEED = 90.0
+
+
+class EntityStore:
+    """
+    Position, velocity, size, HP and sprite of many entities in contiguous arrays.
+
+        x, y          float64   world position (center)
+        prev_x/prev_y float64   position before the last step, for interpolation
+        vx, vy        float64   velocity in pixels per second
+        size          float64   side of the square, in pixels
+        hp            int32
+        sprite        int16     index into the sprite list draw() is given
+        ids           int64     stable entity id of each row
+
+    Every array has `capacity` rows; only the first len(store) are live.
+    Use the properties (store.x, ...) to get views of the live rows.
+    """
+
+    def __init__(self, capacity=INITIAL_CAPACITY, cell_size=None):
+        self.count = 0
+        self._next_id = 1
+        self._row_of: dict[int, int] = {}   # entity id -> row
+        self._alloc(capacity)
+
+        # Rows by tile cell (of their center), see update_index()
+        self.index = SpatialGrid() if cell_size is None else SpatialGrid(cell_size)
+        self._index_stale = False
+        self._max_size = 0.0   # biggest entity so far, for culling margins
+
+    def _alloc(self, capacity):
+        self.capacity = capacity
+        self._x = np.zeros(capacity)
+        self._y = np.zeros(capacity)
+        self._prev_x = np.zeros(capacity)
+        self._prev_y = np.zeros(capacity)
+        self._vx = np.zeros(capacity)
+        self._vy = np.zeros(capacity)
+        self._size = np.zeros(capacity)
+        self._hp = np.zeros(capacity, dtype=np.int32)
+        self._sprite = np.zeros(capacity, dtype=np.int16)
+        self._ids = np.zeros(capacity, dtype=np.int64)
+
+    _FIELDS = ("_x", "_y", "_prev_x", "_prev_y", "_vx", "_vy", "_size", "_hp", "_sprite", "_ids")
+
+    def _grow(self, needed):
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        old = {name: getattr(self, name) for name in self._FIELDS}
+        self._alloc(capacity)
+        for name, values in old.items():
+            getattr(self, name)[:self.count] = values[:self.count]
+
+    # ------------- live views -------------
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def x(self):
+        return self._x[:self.count]
+
+    @property
+    def y(self):
+        return self._y[:self.count]
+
+    @property
+    def vx(self):
+        return self._vx[:self.count]
+
+    @property
+    def vy(self):
+        return self._vy[:self.count]
+
+    @property
+    def size(self):
+        return self._size[:self.count]
+
+    @property
+    def hp(self):
+        return self._hp[:self.count]
+
+    @property
+    def sprite(self):
+        return self._sprite[:self.count]
+
+    @property
+    def ids(self):
+        return self._ids[:self.count]
+
+    def row_of(self, entity_id) -> int | None:
+        return self._row_of.get(entity_id)
+
+    # ------------- spawning -------------
+
+    def spawn_many(self, x, y, vx=0.0, vy=0.0, size=SLIME_SIZE, hp=SLIME_HP, sprite=0):
+        """
+        Add len(x) entities. Every argument is an array or a scalar.
+        Returns their ids.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        n = len(x)
+        start, end = self.count, self.count + n
+        if end > self.capacity:
+            self._grow(end)
+
+        rows = slice(start, end)
+        self._x[rows] = x
+        self._y[rows] = y
+        self._prev_x[rows] = x
+        self._prev_y[rows] = y
+        self._vx[rows] = vx
+        self._vy[rows] = vy
+        self._size[rows] = size
+        self._hp[rows] = hp
+        self._sprite[rows] = sprite
+
+        ids = np.arange(self._next_id, self._next_id + n, dtype=np.int64)
+        self._ids[rows] = ids
+        self._next_id += n
+        for offset, entity_id in enumerate(ids.tolist()):
+            self._row_of[entity_id] = start + offset
+        self.index.add(np.arange(start, end), self._x[rows], self._y[rows])
+        self._max_size = max(self._max_size, float(self._size[rows].max(initial=0.0)))
+
+        self.count = end
+        return ids
+
+    def spawn(self, x, y, **fields) -> int:
+        return int(self.spawn_many([x], [y], **fields)[0])
+
+    def despawn(self, entity_id):
+        """Remove one entity; the last row moves into its place."""
+        row = self._row_of.pop(entity_id)
+        last = self.count - 1
+        self.index.remove_row(row, renumber_from=last)
+        if row != last:
+            for name in self._FIELDS:
+                array = getattr(self, name)
+                array[row] = array[last]
+            self._row_of[int(self._ids[row])] = row
+        self.count = last
+
+    # ------------- simulation (whole arrays at once) -------------
+
+    def step(self, dt):
+        """Move every entity by its velocity."""
+        n = self.count
+        self._prev_x[:n] = self._x[:n]
+        self._prev_y[:n] = self._y[:n]
+        self._x[:n] += self._vx[:n] * dt
+        self._y[:n] += self._vy[:n] * dt
+        self._index_stale = self._index_stale or dt != 0
+
+    def clamp_to_world(self, world_width, world_height, bounce=True):
+        """Player.clamp_to_world for every entity; bounce=True reverses velocity at walls."""
+        n = self.count
+        half = self._size[:n] * 0.5
+        for pos, vel, limit in ((self._x[:n], self._vx[:n], world_width),
+                                (self._y[:n], self._vy[:n], world_height)):
+            high_limit = limit - half
+            low = pos < half
+            high = pos > high_limit
+            # Most ticks nobody touches a wall; skip the masked writes then
+            if low.any():
+                np.maximum(pos, half, out=pos)
+                if bounce:
+                    vel[low] = np.abs(vel[low])
+            if high.any():
+                np.minimum(pos, high_limit, out=pos)
+                if bounce:
+                    vel[high] = -np.abs(vel[high])
+
+    def wander(self, rng, dt, speed=SLIME_SPEED, turn_chance=SLIME_TURN_CHANCE):
+        """Some entities pick a new random direction (or stop) this tick."""
+        n = self.count
+        # Draw how many turn, then which: a few random numbers, not one per entity
+        turns = rng.binomial(n, min(1.0, turn_chance * dt)) if n else 0
+        if turns:
+            turning = rng.integers(0, n, turns)
+            angle = rng.random(turns) * (2 * np.pi)
+            moving = rng.random(turns) < 0.8
+            self._vx[turning] = np.cos(angle) * speed * moving
+            self._vy[turning] = np.sin(angle) * speed * moving
+
+    # ------------- spatial index -------------
+
+    def update_index(self):
+        """
+        Re-file the entities whose center moved into another cell since the
+        last update. Queries call this themselves; returns how many changed cell.
+        """
+        if not self._index_stale:
+            return 0
+        self._index_stale = False
+        return self.index.update(self.x, self.y)
+
+    def rows_in_rect(self, rect):
+        """
+        Rows of the entities filed in the cells that rect (world space) touches.
+        A broad phase: some may lie just outside it.
+        """
+        self.update_index()
+        return self.index.query_rect(*rect)
+
+    def within(self, x, y, radius):
+        """
+        Rows of the entities whose center is within radius of (x, y).
+        Rows are only valid until the next despawn; self.ids[rows] gives their ids.
+        """
+        self.update_index()
+        rows = self.index.query_radius(x, y, radius)
+        dx = self._x[rows] - x
+        dy = self._y[rows] - y
+        return rows[dx * dx + dy * dy <= radius * radius]
+
+    def steer_towards(self, rows, x, y, speed):
+        """Point the velocity of these rows at (x, y)."""
+        dx = x - self._x[rows]
+        dy = y - self._y[rows]
+        dist = np.hypot(dx, dy)
+        dist[dist == 0] = 1.0
+        self._vx[rows] = dx / dist * speed
+        self._vy[rows] = dy / dist * speed
+
+    # ------------- camera -------------
+
+    def interpolated_positions(self, alpha):
+        """(x, y) arrays between the previous and the current step."""
+        n = self.count
+        px, py = self._prev_x[:n], self._prev_y[:n]
+        return px + (self._x[:n] - px) * alpha, py + (self._y[:n] - py) * alpha
+
+    def to_screen(self, camera, alpha=1.0):
+        """camera.world_to_screen for every entity: (screen_x, screen_y) arrays."""
+        x, y = self.interpolated_positions(alpha)
+        return x - camera.offset_x, y - camera.offset_y
+
+    # ------------- drawing -------------
+
+    def screen_rects(self, camera, alpha=1.0):
+        """
+        (left, top, size, rows) of the entities that overlap the screen,
+        as int arrays, plus the rows they came from.
+
+        Only the entities in the index cells around camera.viewport() are
+        looked at, so the cost follows what is on screen, not the world.
+        """
+        # Index cells hold centers: grow the view by half the biggest entity,
+        # plus a cell for the interpolated position lagging the indexed one
+        margin = int(self._max_size // 2) + self.index.cell_size
+        candidates = self.rows_in_rect(camera.viewport(margin))
+
+        px, py = self._prev_x[candidates], self._prev_y[candidates]
+        sx = px + (self._x[candidates] - px) * alpha - camera.offset_x
+        sy = py + (self._y[candidates] - py) * alpha - camera.offset_y
+        size = self._size[candidates]
+        left = (sx - size / 2).astype(np.int32)
+        top = (sy - size / 2).astype(np.int32)
+        side = size.astype(np.int32)
+
+        view_w, view_h = camera.screen.get_size()
+        on_screen = (left + side > 0) & (top + side > 0) & (left < view_w) & (top < view_h)
+        keep = np.flatnonzero(on_screen)
+        return left[keep], top[keep], side[keep], candidates[keep]
+
+    def draw(self, batch, camera, sprites, alpha=1.0):
+        """
+        Queue every on-screen entity into a sprites.SpriteBatch:
+        sprites[row's sprite] at the entity's top-left. Returns how many.
+        """
+        left, top, _side, rows = self.screen_rects(camera, alpha)
+        batch.add_many(sprites, self._sprite[rows], left, top)
+        return len(rows)
+
+
+def spawn_slimes(store, count, world_width, world_height, rng):
+    """Scatter count slimes over the world, each heading somewhere random."""
+    x = rng.uniform(SLIME_SIZE, world_width - SLIME_SIZE, count)
+    y = rng.uniform(SLIME_SIZE, world_height - SLIME_SIZE, count)
+    angle = rng.random(count) * (2 * np.pi)
+    # Sprite i is ("slime", i) in sprites.build_world_atlas(), one per color
+    looks = rng.integers(0, len(SLIME_COLORS), count)
+    return store.spawn_many(
+        x, y,
+        vx=np.cos(angle) * SLIME_SPEED,
+        vy=np.sin(angle) * SLIME_SPEED,
+        size=SLIME_SIZE,
+        hp=SLIME_HP,
+        sprite=looks,
+    )
@@ -1,13 +1,23 @@
+import os
 import pygame
 import sys
 
 from graphs import Button
-from gui import SettingsMenu
 
 from grid import Grid
-from camera import Camera
-from player import Player
-from inventory_ui import InventoryUI
+from engine import (
+    Simulation, InputRecording,
+    WORLD_WIDTH, WORLD_HEIGHT, SIM_DT, MAX_SIM_STEPS,
+)
+from entities import SLIME_COLORS
+from dirty_rects import DirtyRects
+from world_map import ChunkedMap, MAP_PATH
+from transitions import Fade
+from profiler import FrameProfiler
+from render import Backdrop, RenderGraph, RenderLayer
+from sprites import SpriteBatch, build_world_atlas
+from savegame import saver, SaveError
+from journal import Autosave, load_journaled
 
 
 # WORLD / CAMERA SETTINGS
@@ -15,24 +25,56 @@ from inventory_ui import InventoryUI
 TILE_SIZE = 40
 GRID_COLOR = (60, 60, 60)
 
-WORLD_WIDTH = 4000
-WORLD_HEIGHT = 4000
 BACKGROUND_COLOR = (30, 30, 40)
 
-def start_game(screen):
-    """Main game loop. main.py calls: start_game(screen)"""
+# Only push the screen regions that changed to the display
+# (and skip presenting entirely when nothing did).
+DIRTY_RECTS = True
+
+FADE_TIME = 0.35  # seconds for the fade in/out of the game screen
+
+RENDER_FPS = 60     # 0 = render as fast as possible (simulation rate is in engine.py)
+PAUSED_FPS = 30     # behind the inventory / settings the world is a still frame; save power
+
+# Set to a file path to record movement input for engine.py --replay
+RECORD_INPUT_ENV = "LASAIRE_RECORD_INPUT"
+
+# F9 (while the profiler overlay is on) writes the frame trace here
+PROFILE_TRACE_PATH = "profile_trace"   # + .csv / .json
+
+# The game autosaves here (snapshot + journal); "Load Game" loads it
+SAVE_PATH = "../saves/quicksave.sav"
+SAVE_COMPRESSED = True
+
+def start_game(screen, saved=None):
+    """
+    Main game loop. main.py calls: start_game(screen)
+    saved: (player, settings) from load_game() to continue a save.
+    """
     clock = pygame.time.Clock()
 
     grid = Grid()
-    camera = Camera(screen, WORLD_WIDTH, WORLD_HEIGHT)
 
-    # Start player in the center of the world
-    player = Player(WORLD_WIDTH / 2, WORLD_HEIGHT / 2, speed=300)
+    # Player / camera / inventory logic lives in engine.Simulation
+    sim = Simulation(screen, WORLD_WIDTH, WORLD_HEIGHT)
+    if saved is not None:
+        sim.player = saved[0]
+    else:
+        sim.give_starting_items()
+    player = sim.player
+    camera = sim.camera
 
-    # Give some starting items so you can see the inventory working
-    player.add_item("rusty_sword", 2)
-    player.add_item("small_hp_potion", 200)
-    player.add_item("slime_goo", 5)
+    # Player, mob and item icon sprites, packed into one atlas
+    atlas = build_world_atlas(player.size, player.color)
+    player_sprite = atlas["player"]
+    slime_sprites = [atlas[("slime", i)] for i in range(len(SLIME_COLORS))]
+    world_sprites = SpriteBatch()
+
+    # Streamed world map (None -> plain BACKGROUND_COLOR)
+    world_map = ChunkedMap.open(MAP_PATH, WORLD_WIDTH, WORLD_HEIGHT)
+
+    record_path = os.environ.get(RECORD_INPUT_ENV)
+    recording = InputRecording() if record_path else None
 
     # --- GUI / settings ---
     screen_w, screen_h = screen.get_size()
@@ -53,98 +95,263 @@ def start_game(screen):
 
     settings = {
         "show_grid": True,
+        "dirty_rects": DIRTY_RECTS,
+        "show_profiler": False,
     }
+    if saved is not None:
+        settings.update((k, v) for k, v in saved[1].items() if k in settings)
+    last_settings = dict(settings)
 
     paused = False
 
-    # Inventory UI (new)
-    inventory_ui = InventoryUI()
+    # Inventory UI and settings menu are built (and imported) the first
+    # time they are opened; until then they are None.
+    inventory_ui = None
+    settings_menu = None
+
+    def get_inventory_ui():
+        nonlocal inventory_ui
+        if inventory_ui is None:
+            from inventory_ui import InventoryUI
+            inventory_ui = InventoryUI(icons=atlas)
+        return inventory_ui
+
+    def get_settings_menu():
+        nonlocal settings_menu
+        if settings_menu is None:
+            from gui import SettingsMenu
+            settings_menu = SettingsMenu(
+                screen,
+                settings=settings,
+                on_close=on_settings_close,
+                on_return_to_menu=go_back_to_main_menu,
+            )
+        return settings_menu
+
+    def inventory_open():
+        return inventory_ui is not None and inventory_ui.open
+
+    def settings_visible():
+        return settings_menu is not None and settings_menu.visible
 
     def on_settings_close():
         nonlocal paused
         # Only unpause if the inventory is not open
-        if not inventory_ui.open:
+        if not inventory_open():
             paused = False
 
-    def go_back_to_main_menu():
-        nonlocal paused, running
-        paused = False
-        inventory_ui.close()
+    fade = Fade(screen, color=(0, 0, 0))
+
+    def stop_running():
+        nonlocal running
         running = False   # exit game loop, main.py shows the menu again
 
-    settings_menu = SettingsMenu(
-        screen,
-        settings=settings,
-        on_close=on_settings_close,
-        on_return_to_menu=go_back_to_main_menu,
-    )
+    # Journals changes as they happen; writing happens on the save thread.
+    # A new game leaves the old save alone until F5 or leaving the game.
+    autosave = Autosave(player, settings, SAVE_PATH, compress=SAVE_COMPRESSED,
+                        start=saved is not None)
+
+    def leave_game():
+        # Fade to black first; the loop keeps running until it's done
+        if not (fade.active and fade.target > 0):
+            autosave.close()
+            fade.fade_out(FADE_TIME, on_done=stop_running, from_clear=False)
+
+    def go_back_to_main_menu():
+        nonlocal paused
+        paused = False
+        if settings_menu is not None:
+            settings_menu.visible = False
+        if inventory_ui is not None:
+            inventory_ui.close()
+        leave_game()
 
     def open_settings():
         nonlocal paused
         paused = True
-        inventory_ui.close()
-        settings_menu.open()
+        if inventory_ui is not None:
+            inventory_ui.close()
+        get_settings_menu().open()
 
     settings_button.callback = open_settings
 
+    dirty = DirtyRects(screen, enabled=settings["dirty_rects"])
+    profiler = FrameProfiler()
+
+    # --- RENDER LAYERS (bottom to top) ---
+    # Layers with a state function are composed from one cached surface
+    # while their state stays the same (see render.py).
+    def view_state():
+        return camera.offset_x, camera.offset_y, screen.get_size()
+
+    def draw_map(screen):
+        if world_map is None:
+            screen.fill(BACKGROUND_COLOR)
+            return []
+        world_map.update(camera)
+        return world_map.draw(screen, camera)
+
+    def draw_grid(screen):
+        if not settings.get("show_grid", True):
+            return []
+        return grid.draw(screen, camera)
+
+    def entities_state():
+        # Interpolation only moves anything while the world runs
+        return sim.version, None if paused else alpha, view_state()
+
+    def draw_entities(screen):
+        # Everything in the world goes out in one blits() call
+        sim.slimes.draw(world_sprites, camera, slime_sprites, alpha)
+        player.draw(world_sprites, camera, player_sprite, alpha)
+        return world_sprites.draw(screen)
+
+    def draw_overlays(screen):
+        rects = []
+        if settings_menu is not None:
+            rects += settings_menu.draw()
+        if inventory_ui is not None:
+            rects += inventory_ui.draw(screen, player)
+        return rects
+
+    def draw_profiler(screen):
+        if settings.get("show_profiler"):
+            return profiler.draw(screen)
+        return profiler.hide(screen)
+
+    layers = RenderGraph([
+        RenderLayer("map", draw_map, state=view_state, section="map"),
+        RenderLayer("grid", draw_grid, state=view_state, section="grid"),
+        RenderLayer("entities", draw_entities, state=entities_state, section="entities"),
+        RenderLayer("hud", settings_button.draw, state=settings_button.state, section="ui"),
+        # While paused everything up to here is one cached, already dimmed freeze-frame
+        Backdrop(lambda: inventory_open() or settings_visible()).layer(section="ui"),
+        RenderLayer("overlays", draw_overlays, section="ui"),
+        RenderLayer("fade", fade.draw, section="ui"),
+        RenderLayer("profiler", draw_profiler),
+    ])
+
+    # Come in from black (main.py faded out before calling us)
+    fade.fade_in(FADE_TIME)
+
+    accumulator = 0.0
+    alpha = 0.0
+
     running = True
     while running:
-        dt = clock.tick(60) / 1000.0
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-
-            if settings_menu.visible:
-                settings_menu.handle_event(event)
-            else:
-                # --- Keyboard ---
-                if event.type == pygame.KEYDOWN:
-                    # ESC: return to main menu
-                    if event.key == pygame.K_ESCAPE:
-                        running = False
-
-                    # I: open/close inventory
-                    elif event.key == pygame.K_i:
-                        inventory_ui.toggle()
-                        paused = inventory_ui.open or settings_menu.visible
-
-                    # Inventory key controls
-                    if inventory_ui.open:
-                        inventory_ui.handle_key(event.key, player)
-
-                # Mouse inside inventory
-                if inventory_ui.open:
-                    inventory_ui.handle_mouse(event, player)
-
-                # Settings button still active when menus closed
-                settings_button.handle_event(event)
-
-        if not paused:
+        with profiler.section("wait"):
+            # Menus don't need 60 fps, but fades still get it
+            fps = PAUSED_FPS if paused and not fade.active else RENDER_FPS
+            dt = clock.tick(fps) / 1000.0
+        accumulator += dt
+
+        with profiler.section("events"):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    autosave.flush()
+                    pygame.quit()
+                    sys.exit()
+
+                if settings_visible():
+                    settings_menu.handle_event(event)
+                else:
+                    # --- Keyboard ---
+                    if event.type == pygame.KEYDOWN:
+                        # ESC: return to main menu
+                        if event.key == pygame.K_ESCAPE:
+                            leave_game()
+
+                        # I: open/close inventory
+                        elif event.key == pygame.K_i:
+                            get_inventory_ui().toggle()
+                            paused = inventory_open() or settings_visible()
+
+                        # F5: quick save
+                        elif event.key == pygame.K_F5:
+                            autosave.flush()
+                            print(f"Saving game to {SAVE_PATH}")
+
+                        # F9: dump the profiler trace
+                        elif event.key == pygame.K_F9 and settings.get("show_profiler"):
+                            profiler.dump_csv(PROFILE_TRACE_PATH + ".csv")
+                            profiler.dump_json(PROFILE_TRACE_PATH + ".json")
+                            print(f"Wrote {PROFILE_TRACE_PATH}.csv / .json")
+
+                        # Inventory key controls
+                        if inventory_open():
+                            inventory_ui.handle_key(event.key, player)
+
+                    # Mouse inside inventory
+                    if inventory_open():
+                        inventory_ui.handle_mouse(event, player)
+
+                    # Settings button still active when menus closed
+                    settings_button.handle_event(event)
+
+        with profiler.section("input"):
             keys = pygame.key.get_pressed()
-            player.handle_input(keys, dt)
-            # Your Player.clamp_to_world() still uses WORLD_WIDTH/HEIGHT
-            player.clamp_to_world(WORLD_WIDTH,WORLD_HEIGHT)
-            camera.update(player.x, player.y)
-
-        # --- DRAW WORLD ---
-        screen.fill(BACKGROUND_COLOR)
-
-        if settings.get("show_grid", True):
-            grid.draw(screen, camera)
-
-        player.draw(screen, camera)
-        settings_button.draw(screen)
-        settings_menu.draw()
-
-        # --- INVENTORY OVERLAY ---
-        inventory_ui.draw(screen, player)
 
-        pygame.display.flip()
+        # --- SIMULATION (fixed steps) ---
+        with profiler.section("sim"):
+            steps = 0
+            while accumulator >= SIM_DT and steps < MAX_SIM_STEPS:
+                sim.step(keys, SIM_DT, paused=paused)
+                if recording is not None and not paused:
+                    recording.record(keys)
+                accumulator -= SIM_DT
+                steps += 1
+
+            if steps == MAX_SIM_STEPS:
+                # Too far behind (slow frame, debugger...): drop the backlog
+                # instead of spiralling into ever longer catch-ups.
+                accumulator = min(accumulator, SIM_DT)
+
+            # How far we are between the last step and the next one
+            alpha = accumulator / SIM_DT
+            camera.update(*player.interpolated_position(alpha))
+
+        with profiler.section("autosave"):
+            autosave.tick(dt)
+
+        # Any settings change (e.g. grid toggled off) redraws everything
+        if settings != last_settings:
+            last_settings = dict(settings)
+            dirty.enabled = settings.get("dirty_rects", DIRTY_RECTS)
+            dirty.invalidate()
+            layers.invalidate()
+
+        # --- DRAW ---
+        if inventory_ui is not None:
+            inventory_ui.update(dt)
+        fade.update(dt)
+        dirty.add(layers.draw(screen, profiler))
+
+        with profiler.section("present"):
+            dirty.present()
+        profiler.end_frame()
+
+    if recording is not None:
+        recording.save(record_path)
+        print(f"Saved {len(recording)} ticks of input to {record_path}")
 
     return
 
-def load_game():
-    # placeholder so the "Load Game" button keeps working
-    print("Load game not implemented yet.")
+def load_game(path=SAVE_PATH):
+    """
+    (player, settings) from the save file, for start_game(screen, saved=...).
+    Returns None if there is no save or it can't be read.
+    """
+    try:
+        saver.wait()   # a save may still be on its way to disk
+    except SaveError:
+        # Already reported by the saver. Saves are written atomically,
+        # so the file still holds the last one that worked.
+        print("Loading the last save that finished")
+    if not os.path.exists(path):
+        print("No saved game yet.")
+        return None
+    try:
+        return load_journaled(path)
+    except (OSError, SaveError) as e:
+        print(f"Could not load {path}: {e}")
+        return None
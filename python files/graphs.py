@@ -1,9 +1,20 @@
+import os
+
 import pygame
-import tkinter as tk
+
+from text_cache import get_font, render_text
 
 # Colors
 WHITE = (255, 255, 255)
 
+# Screen resolution override, e.g. (1920, 1080). The LASAIRE_RESOLUTION
+# environment variable ("1920x1080") does the same without editing code.
+RESOLUTION_OVERRIDE = None
+RESOLUTION_ENV = "LASAIRE_RESOLUTION"
+FALLBACK_RESOLUTION = (1280, 720)
+
+_cached_resolution = None
+
 
 class Button:
     def __init__(
@@ -21,20 +32,32 @@ class Button:
         self.color = color
         self.hover_color = hover_color
         self.text_color = text_color
+        self._last_state = None  # (hovered, text) of the last draw
+
+    def state(self):
+        """What the button looks like right now: (hovered, text)."""
+        return self.rect.collidepoint(pygame.mouse.get_pos()), self.text
 
     def draw(self, surface):
-        mouse_pos = pygame.mouse.get_pos()
+        """Draw the button. Returns the screen rects that changed since the last draw."""
+        state = self.state()
 
         # Hover color
-        bg_color = self.hover_color if self.rect.collidepoint(mouse_pos) else self.color
+        hovered = state[0]
+        bg_color = self.hover_color if hovered else self.color
         pygame.draw.rect(surface, bg_color, self.rect, border_radius=8)
 
-        # Font created here (pygame.init() will be called in main.py)
-        font = pygame.font.SysFont("georgia", 32)
-        text_surface = font.render(self.text, True, self.text_color)
+        # Font is looked up lazily (pygame.init() will be called in main.py)
+        font = get_font("georgia", 32)
+        text_surface = render_text(font, self.text, self.text_color)
         text_rect = text_surface.get_rect(center=self.rect.center)
         surface.blit(text_surface, text_rect)
 
+        if state == self._last_state:
+            return []
+        self._last_state = state
+        return [self.rect.copy()]
+
     def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
             if self.rect.collidepoint(event.pos):
@@ -42,15 +65,46 @@ class Button:
                 self.callback()
 
 
+def _parse_resolution(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
 def get_screen_resolution():
-    """Try to get the OS screen size, fall back to 1280x720."""
+    """
+    Get the desktop size through pygame, fall back to 1280x720.
+    The result is cached, and can be overridden with RESOLUTION_OVERRIDE
+    or the LASAIRE_RESOLUTION environment variable.
+    """
+    global _cached_resolution
+    if _cached_resolution is not None:
+        return _cached_resolution
+
+    if RESOLUTION_OVERRIDE is not None:
+        _cached_resolution = tuple(RESOLUTION_OVERRIDE)
+        return _cached_resolution
+
+    env = os.environ.get(RESOLUTION_ENV)
+    if env:
+        try:
+            _cached_resolution = _parse_resolution(env)
+            return _cached_resolution
+        except ValueError:
+            print(f"Ignoring bad {RESOLUTION_ENV}={env!r}, expected WIDTHxHEIGHT")
+
     try:
-        root = tk.Tk()
-        root.withdraw()
-        width = root.winfo_screenwidth()
-        height = root.winfo_screenheight()
-        root.destroy()
-        return width, height
-    except Exception as e:
+        if not pygame.display.get_init():
+            pygame.display.init()
+        sizes = pygame.display.get_desktop_sizes()
+        if sizes and sizes[0][0] > 0:
+            _cached_resolution = tuple(sizes[0])
+        else:
+            # Only valid before set_mode(), which is when main.py asks
+            info = pygame.display.Info()
+            _cached_resolution = (info.current_w, info.current_h)
+        if _cached_resolution[0] <= 0 or _cached_resolution[1] <= 0:
+            raise pygame.error("display reported no size")
+    except pygame.error as e:
         print(f"Error retrieving screen resolution: {e}")
-        return 1280, 720
+        _cached_resolution = FALLBACK_RESOLUTION
+    return _cached_resolution
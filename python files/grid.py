@@ -5,26 +5,79 @@ GRID_WIDTH = 30     # tiles horizontally
 GRID_HEIGHT = 20    # tiles vertically
 GRID_COLOR = (60, 60, 60)
 
+# Color used for the "see-through" pixels of the cached grid layer.
+# Anything that is not GRID_COLOR works.
+LAYER_COLORKEY = (255, 0, 255)
+
 
 class Grid:
     def __init__(self, tile_size=TILE_SIZE):
         self.tile_size = tile_size
+        self._last_view = None  # (offset, screen size) of the last draw
+
+        # Pre-rendered grid lines, one tile bigger than the screen in each direction
+        self._layer: pygame.Surface | None = None
+        self._layer_key = None  # (screen size, tile size) the layer was built for
+
+    def _build_layer(self, screen):
+        """Draw all grid lines once into a surface one cell larger than the screen."""
+        screen_w, screen_h = screen.get_size()
+        tile = self.tile_size
+        width = screen_w + tile
+        height = screen_h + tile
+
+        # Same pixel format as the screen so blitting doesn't need a conversion
+        layer = pygame.Surface((width, height), 0, screen)
+        layer.fill(LAYER_COLORKEY)
+        layer.set_colorkey(LAYER_COLORKEY, pygame.RLEACCEL)
+
+        for x in range(0, width, tile):
+            pygame.draw.line(layer, GRID_COLOR, (x, 0), (x, height))
+        for y in range(0, height, tile):
+            pygame.draw.line(layer, GRID_COLOR, (0, y), (width, y))
+
+        self._layer = layer
+        self._layer_key = (screen_w, screen_h, tile)
 
     def draw(self, screen, camera):
         """
         Draw the grid in world space, taking the camera offset into account.
         This way, when the player moves (and the camera follows),
         the grid will scroll instead of staying glued to the screen.
+
+        The lines are only drawn once into a cached layer (rebuilt on resize or
+        tile-size change); every frame is a single offset blit of that layer.
+        Returns the screen rects that changed since the last draw.
         """
         screen_w, screen_h = screen.get_size()
+        if self._layer_key != (screen_w, screen_h, self.tile_size):
+            self._build_layer(screen)
 
         # How far we are scrolled in world coordinates
         offset_x = camera.offset_x
         offset_y = camera.offset_y
 
+        # Shift the layer back by how far we are into the current tile
+        start_x = - int(offset_x % self.tile_size)
+        start_y = - int(offset_y % self.tile_size)
+        screen.blit(self._layer, (start_x, start_y))
+
+        view = (offset_x, offset_y, screen_w, screen_h, self.tile_size)
+        if view == self._last_view:
+            return []
+        self._last_view = view
+        return [screen.get_rect()]
+
+    def draw_lines(self, screen, camera):
+        """
+        The old per-frame path: one pygame.draw.line call per column and row.
+        Kept for benchmarks.py to compare against draw().
+        """
+        screen_w, screen_h = screen.get_size()
+
         # Start drawing lines a bit *before* the visible area, so we cover the whole screen.
-        start_x = - (offset_x % self.tile_size)
-        start_y = - (offset_y % self.tile_size)
+        start_x = - (camera.offset_x % self.tile_size)
+        start_y = - (camera.offset_y % self.tile_size)
 
         # Vertical lines
         x = start_x
@@ -1,5 +1,6 @@
 import pygame
 from graphs import Button
+from text_cache import get_font, render_text
 
 PANEL_COLOR = (15, 15, 25)
 PANEL_ALPHA = 220
@@ -21,12 +22,13 @@ class SettingsMenu:
         self.on_close = on_close
         self.on_return_to_menu = on_return_to_menu
         self.visible = False
+        self._was_drawn = False  # for dirty-rect rendering
 
         self.screen_width, self.screen_height = self.screen.get_size()
 
         # Panel rectangle in the middle of the screen
         panel_width = 400
-        panel_height = 320
+        panel_height = 380
         self.panel_rect = pygame.Rect(
             (self.screen_width - panel_width) // 2,
             (self.screen_height - panel_height) // 2,
@@ -34,8 +36,12 @@ class SettingsMenu:
             panel_height,
         )
 
-        self.font_title = pygame.font.SysFont("georgia", 32)
-        self.font_text = pygame.font.SysFont("georgia", 24)
+        # Translucent panel background, made once
+        self._panel = pygame.Surface(self.panel_rect.size, pygame.SRCALPHA)
+        self._panel.fill((*PANEL_COLOR, PANEL_ALPHA))
+
+        self.font_title = get_font("georgia", 32)
+        self.font_text = get_font("georgia", 24)
 
         self.buttons = []
 
@@ -50,6 +56,10 @@ class SettingsMenu:
             self.settings["show_grid"] = not self.settings.get("show_grid", True)
             print("Show grid:", self.settings["show_grid"])
 
+        def toggle_profiler():
+            self.settings["show_profiler"] = not self.settings.get("show_profiler", False)
+            print("Show profiler:", self.settings["show_profiler"])
+
         def close_menu():
             self.visible = False
             if self.on_close:
@@ -75,13 +85,28 @@ class SettingsMenu:
             )
         )
 
-        # Return to main menu button
+        # Toggle profiler overlay button
         self.buttons.append(
             Button(
                 self.panel_rect.x + (self.panel_rect.width - btn_w) // 2,
                 start_y + spacing,
                 btn_w,
                 btn_h,
+                "Toggle profiler",
+                toggle_profiler,
+                text_color=(255, 255, 255),
+                color=(0, 0, 0),
+                hover_color=(70, 70, 70),
+            )
+        )
+
+        # Return to main menu button
+        self.buttons.append(
+            Button(
+                self.panel_rect.x + (self.panel_rect.width - btn_w) // 2,
+                start_y + 2 * spacing,
+                btn_w,
+                btn_h,
                 "Return to menu",
                 return_to_menu,
                 text_color=(255, 255, 255),
@@ -94,7 +119,7 @@ class SettingsMenu:
         self.buttons.append(
             Button(
                 self.panel_rect.x + (self.panel_rect.width - btn_w) // 2,
-                start_y + 2 * spacing,
+                start_y + 3 * spacing,
                 btn_w,
                 btn_h,
                 "Resume",
@@ -123,25 +148,28 @@ class SettingsMenu:
             b.handle_event(event)
 
     def draw(self):
+        """Draw the overlay. Returns the screen rects that changed since the last draw."""
         if not self.visible:
-            return
-
-        # Dim the game behind with a translucent overlay
-        overlay = pygame.Surface(self.screen.get_size(), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 120))
-        self.screen.blit(overlay, (0, 0))
+            if self._was_drawn:
+                self._was_drawn = False
+                return [self.screen.get_rect()]
+            return []
 
         # Settings panel
-        panel_surface = pygame.Surface(self.panel_rect.size, pygame.SRCALPHA)
-        panel_surface.fill((*PANEL_COLOR, PANEL_ALPHA))
-        self.screen.blit(panel_surface, self.panel_rect.topleft)
+        self.screen.blit(self._panel, self.panel_rect.topleft)
 
         # Title text
-        title_surf = self.font_title.render("Settings", True, TEXT_COLOR)
+        title_surf = render_text(self.font_title, "Settings", TEXT_COLOR)
         title_rect = title_surf.get_rect(center=(self.panel_rect.centerx,
                                                  self.panel_rect.y + 40))
         self.screen.blit(title_surf, title_rect)
 
         # Draw buttons
+        changed = []
         for b in self.buttons:
-            b.draw(self.screen)
+            changed += b.draw(self.screen)
+
+        if not self._was_drawn:
+            self._was_drawn = True
+            return [self.screen.get_rect()]
+        return changed
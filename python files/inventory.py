@@ -0,0 +1,377 @@
+# inventory.py
+
+from items import Item, ItemStack, create_item
+
+# Categories that have their own tab in the inventory UI; the rest are "other"
+MAIN_CATEGORIES = ("weapon", "consumable", "material")
+
+
+def _category_of(item: Item) -> str:
+    return (item.category or "").lower()
+
+
+class Inventory:
+    """
+    Ordered list of ItemStacks with secondary indexes, so lookups don't
+    have to scan every stack:
+
+      template_id -> stacks      (remove / count)
+      unique_id   -> stacks      (stacking onto an existing item instance)
+      category    -> stacks      (inventory UI tabs)
+      template_id -> total amount
+
+    Iterating gives the stacks in the order they were added, like the old list.
+
+    Every change (a single add/remove, or a whole apply() batch) bumps
+    `version` and calls the subscribed listeners once: listener(inventory, ops).
+    Anything derived from the contents can be cached per version.
+    """
+
+    def __init__(self, max_slots: int = 20):
+        self.max_slots = max_slots
+
+        # seq -> stack. dicts keep insertion order and delete in O(1).
+        self._stacks: dict[int, ItemStack] = {}
+        self._seq_of: dict[int, int] = {}   # id(stack) -> seq
+        self._next_seq = 0
+
+        self._by_template: dict[str, dict[int, ItemStack]] = {}
+        self._by_uid: dict[object, dict[int, ItemStack]] = {}
+        self._by_category: dict[str, dict[int, ItemStack]] = {}
+        self._totals: dict[str, int] = {}
+
+        self.version = 0
+        self._listeners = []
+        self._undo: list | None = None   # undo log while apply() runs
+
+    # ------------- change notification -------------
+
+    def subscribe(self, listener):
+        """listener(inventory, ops) is called after every change."""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self._listeners.remove(listener)
+
+    def _notify(self, ops):
+        self.version += 1
+        for listener in list(self._listeners):
+            listener(self, ops)
+
+    # ------------- list-like access -------------
+
+    def __len__(self):
+        return len(self._stacks)
+
+    def __iter__(self):
+        return iter(list(self._stacks.values()))
+
+    def __bool__(self):
+        return bool(self._stacks)
+
+    def free_slots(self) -> int:
+        return max(0, self.max_slots - len(self._stacks))
+
+    def restore(self, stacks):
+        """
+        Replace the whole contents with these stacks, as they are
+        (no stacking, no slot limit), e.g. when loading a save.
+        Listeners get a single ("restore", None, stack_count) op.
+        """
+        self._stacks = dict(enumerate(stacks))
+        self._next_seq = len(self._stacks)
+        self._index_all()
+        self._notify([("restore", None, len(self._stacks))])
+
+    # ------------- index maintenance -------------
+
+    @staticmethod
+    def _index_add(index, key, seq, stack):
+        bucket = index.get(key)
+        if bucket is None:
+            bucket = index[key] = {}
+        bucket[seq] = stack
+
+    @staticmethod
+    def _index_remove(index, key, seq):
+        bucket = index[key]
+        del bucket[seq]
+        if not bucket:
+            del index[key]
+
+    def _append_stack(self, stack: ItemStack):
+        seq = self._next_seq
+        self._next_seq += 1
+        item = stack.item
+
+        self._stacks[seq] = stack
+        self._seq_of[id(stack)] = seq
+        self._index_add(self._by_template, item.template_id, seq, stack)
+        self._index_add(self._by_uid, item.unique_id, seq, stack)
+        self._index_add(self._by_category, _category_of(item), seq, stack)
+        self._totals[item.template_id] = self._totals.get(item.template_id, 0) + stack.amount
+        if self._undo is not None:
+            self._undo.append(("append", stack, seq))
+
+    def _remove_stack(self, stack: ItemStack):
+        seq = self._seq_of.pop(id(stack))
+        item = stack.item
+        if self._undo is not None:
+            self._undo.append(("remove", stack, seq))
+
+        del self._stacks[seq]
+        self._index_remove(self._by_template, item.template_id, seq)
+        self._index_remove(self._by_uid, item.unique_id, seq)
+        self._index_remove(self._by_category, _category_of(item), seq)
+        self._change_total(item.template_id, -stack.amount)
+
+    def _set_amount(self, stack: ItemStack, amount: int):
+        if self._undo is not None:
+            self._undo.append(("amount", stack, stack.amount))
+        self._change_total(stack.item.template_id, amount - stack.amount)
+        stack.amount = amount
+
+    def _change_total(self, template_id, delta):
+        total = self._totals.get(template_id, 0) + delta
+        if total:
+            self._totals[template_id] = total
+        else:
+            self._totals.pop(template_id, None)
+
+    def _rebuild_indexes(self):
+        """Recompute order, indexes and totals from scratch (only used on rollback)."""
+        self._stacks = dict(sorted(self._stacks.items()))
+        self._index_all()
+
+    def _index_all(self):
+        """Build every index from self._stacks, which must be in seq order."""
+        self._seq_of = {}
+        self._by_template = {}
+        self._by_uid = {}
+        self._by_category = {}
+        self._totals = {}
+        seq_of = self._seq_of
+        totals = self._totals
+        index_add = self._index_add
+        for seq, stack in self._stacks.items():
+            item = stack.item
+            template_id = item.template_id
+            seq_of[id(stack)] = seq
+            index_add(self._by_template, template_id, seq, stack)
+            index_add(self._by_uid, item.unique_id, seq, stack)
+            index_add(self._by_category, _category_of(item), seq, stack)
+            totals[template_id] = totals.get(template_id, 0) + stack.amount
+
+    def _rollback(self, undo):
+        """Undo everything in the log, newest first."""
+        for kind, stack, value in reversed(undo):
+            if kind == "amount":
+                stack.amount = value
+            elif kind == "append":
+                del self._stacks[value]
+            else:  # "remove"
+                self._stacks[value] = stack
+        self._rebuild_indexes()
+
+    # ------------- lookups -------------
+
+    def stacks_for_template(self, template_id: str) -> list[ItemStack]:
+        return list(self._by_template.get(template_id, {}).values())
+
+    def stacks_for_uid(self, unique_id) -> list[ItemStack]:
+        return list(self._by_uid.get(unique_id, {}).values())
+
+    def stacks_in_category(self, category: str) -> list[ItemStack]:
+        """
+        Stacks for one inventory tab, in inventory order.
+        "all" gives everything, "other" everything outside MAIN_CATEGORIES.
+        """
+        category = category.lower()
+        if category == "all":
+            return list(self._stacks.values())
+        if category == "other":
+            merged = {}
+            for cat, bucket in self._by_category.items():
+                if cat not in MAIN_CATEGORIES:
+                    merged.update(bucket)
+            return [merged[seq] for seq in sorted(merged)]
+        return list(self._by_category.get(category, {}).values())
+
+    def count(self, template_id: str) -> int:
+        """How many of this item there are in total."""
+        return self._totals.get(template_id, 0)
+
+    # ------------- add / remove -------------
+
+    def add(self, item, amount: int = 1) -> bool:
+        """
+        Add an Item (or multiple) to the inventory.
+
+        You can pass:
+          - an Item instance, or
+          - an item_id string (e.g. "slime_goo")
+
+        Returns True if everything was added, False if there's not enough space.
+        """
+        # If we got an item_id string instead of an Item instance, create it:
+        if isinstance(item, str):
+            item = create_item(item)
+
+        before = self.count(item.template_id)
+        ok = self._add(item, amount)
+        added = self.count(item.template_id) - before
+        if added:
+            self._notify([("add", item, added)])
+        return ok
+
+    def remove(self, template_id: str, amount: int = 1) -> bool:
+        """
+        Remove a certain amount of an item, oldest stacks first.
+        Returns True if successful, False if not enough items
+        (whatever was there is still removed, same as before).
+        """
+        before = self.count(template_id)
+        ok = self._remove(template_id, amount)
+        removed = before - self.count(template_id)
+        if removed:
+            self._notify([("remove", template_id, removed)])
+        return ok
+
+    def _add(self, item: Item, amount: int) -> bool:
+        # If it's stackable, try to add to an existing stack first
+        if item.stackable:
+            for stack in list(self._by_uid.get(item.unique_id, {}).values()):
+                if not stack.is_full():
+                    can_add = item.max_stack - stack.amount
+                    to_add = min(can_add, amount)
+                    self._set_amount(stack, stack.amount + to_add)
+                    amount -= to_add
+                    if amount <= 0:
+                        return True  # everything added
+
+        # If there's still some amount left, we need new slots
+        while amount > 0:
+            if len(self._stacks) >= self.max_slots:
+                # No more slots
+                return False
+
+            to_add = min(amount, item.max_stack if item.stackable else 1)
+            self._append_stack(ItemStack(item, to_add))
+            amount -= to_add
+
+        return True
+
+    def _remove(self, template_id: str, amount: int) -> bool:
+        # Walk the bucket in place, oldest first; copying it would make
+        # every remove cost as much as there are stacks of the item.
+        bucket = self._by_template.get(template_id)
+        while bucket:
+            stack = next(iter(bucket.values()))
+            if stack.amount > amount:
+                self._set_amount(stack, stack.amount - amount)
+                return True
+            # Stack has no more than we want: remove it and keep going
+            amount -= stack.amount
+            self._remove_stack(stack)
+            if amount <= 0:
+                return True
+        return False
+
+    # ------------- batches -------------
+
+    def _slots_needed(self, item: Item, amount: int, room: dict) -> int:
+        """
+        Upper bound on the new stacks adding amount x item can create.
+        room (unique_id -> free space left in existing stacks) is shared by
+        every add of a batch, so two adds can't both count the same space.
+        """
+        if item.stackable:
+            uid = item.unique_id
+            free = room.get(uid)
+            if free is None:
+                free = sum(item.max_stack - stack.amount for stack in self._by_uid.get(uid, {}).values())
+            used = min(free, amount)
+            room[uid] = free - used
+            amount -= used
+        per_stack = item.max_stack if item.stackable else 1
+        return -(-amount // per_stack)
+
+    def apply(self, ops) -> bool:
+        """
+        Apply a batch of changes atomically:
+
+            inventory.apply([
+                ("add", "slime_goo", 12),
+                ("add", some_item, 1),
+                ("remove", "small_hp_potion", 3),
+            ])
+
+        Either every op succeeds, or nothing changes and False is returned.
+        Listeners are notified once for the whole batch.
+        Raises ValueError for malformed ops (unknown op or item, amount < 1).
+        """
+        # --- validate everything before touching the inventory ---
+        prepared = []
+        net = {}   # template_id -> amount change from this batch
+        removed = set()   # template_ids this batch removes from
+        for op, item, amount in ops:
+            if amount < 1:
+                raise ValueError(f"Amount must be positive: {(op, item, amount)}")
+            if op == "add":
+                if isinstance(item, str):
+                    item = create_item(item)
+                template_id = item.template_id
+                net[template_id] = net.get(template_id, 0) + amount
+            elif op == "remove":
+                template_id = item.template_id if isinstance(item, Item) else item
+                item = template_id
+                removed.add(template_id)
+                net[template_id] = net.get(template_id, 0) - amount
+                # Removes can't take more than is there (counting earlier adds)
+                if self.count(template_id) + net[template_id] < 0:
+                    return False
+            else:
+                raise ValueError(f"Unknown inventory op: {op}")
+            prepared.append((op, item, amount))
+
+        if not prepared:
+            return True
+
+        # A remove can empty a stack that an add was going to top up, so
+        # space in stacks of removed templates doesn't count.
+        room = {}
+        new_slots = 0
+        for op, item, amount in prepared:
+            if op == "add":
+                if item.template_id in removed:
+                    room.setdefault(item.unique_id, 0)
+                new_slots += self._slots_needed(item, amount, room)
+
+        # Fast path: enough free slots even if no remove frees anything,
+        # so no step can fail and no undo log is needed.
+        if new_slots <= self.free_slots():
+            for op, item, amount in prepared:
+                if op == "add":
+                    self._add(item, amount)
+                else:
+                    self._remove(item, amount)
+            self._notify(prepared)
+            return True
+
+        # Tight on space: keep an undo log and roll back if anything fails.
+        self._undo = []
+        try:
+            for op, item, amount in prepared:
+                ok = self._add(item, amount) if op == "add" else self._remove(item, amount)
+                if not ok:
+                    self._rollback(self._undo)
+                    return False
+        except Exception:
+            self._rollback(self._undo)
+            raise
+        finally:
+            self._undo = None
+
+        self._notify(prepared)
+        return True
+
@@ -1,20 +1,75 @@
 import pygame
 from items import ItemStack
+from text_cache import get_font, render_text
+
+CATEGORY_LABELS = [
+    ("all", "1: All"),
+    ("weapon", "2: Weapons"),
+    ("consumable", "3: Consumables"),
+    ("material", "4: Materials"),
+    ("other", "5: Other"),
+]
+
+HINT_TEXT = "Right-click or Enter/Space to equip/use.  1–5 to change category.  Wheel/PgUp/PgDn to scroll."
+
+SLOT_SIZE = 64
+SLOT_PAD = 10
+ROW_HEIGHT = SLOT_SIZE + SLOT_PAD
+COLS = 6  # number of columns in the grid
+DESC_AREA_HEIGHT = 120
+
+SCROLL_SPEED = 15.0       # how fast the view catches up with the scroll target (1/s)
+SCROLLBAR_WIDTH = 6
 
 
 class InventoryUI:
-    def __init__(self):
+    """
+    Inventory overlay.
+
+    Everything it shows is derived from the inventory version, the category,
+    the selection and the equipped weapon. The filtered stack list, the wrapped
+    description and the panel chrome are cached on those and only rebuilt when
+    one of them changes.
+
+    The item grid is virtualized: only the rows inside the scrolled viewport
+    get rects and rendered slots, so a frame costs the same with 20 stacks
+    or 50,000.
+
+    icons: a sprites.SpriteAtlas with ("icon", category) sprites, or None.
+    """
+
+    def __init__(self, icons=None):
         self.open = False
+        self.icons = icons
         self.category = "all"  # "all", "weapon", "consumable", "material", "other"
         self.selected_index = 0
 
         # Fonts for UI
-        self.font = pygame.font.SysFont(None, 24)
-        self.font_small = pygame.font.SysFont(None, 20)
+        self.font = get_font(None, 24)
+        self.font_small = get_font(None, 20)
 
         # list of (pygame.Rect, item_index) for mouse hit detection
         self.item_slots: list[tuple[pygame.Rect, int]] = []
 
+        # What the last draw showed, for dirty-rect rendering
+        self._last_state = None
+
+        # Grid scrolling, in pixels from the top of the first row
+        self.scroll = 0.0
+        self.scroll_target = 0.0
+
+        # --- caches ---
+        self._filtered_key = None
+        self._filtered: list[ItemStack] = []
+        self._layout_key = None
+        self._layout = None
+        self._desc_key = None
+        self._desc_lines: list[str] = []
+        self._chrome_key = None
+        self._chrome: pygame.Surface | None = None   # panel without the grid
+        self._grid_key = None
+        self._grid: pygame.Surface | None = None     # visible rows of the grid
+
     # ------------- state helpers -------------
 
     def toggle(self):
@@ -23,6 +78,14 @@ class InventoryUI:
     def close(self):
         self.open = False
 
+    def update(self, dt):
+        """Ease the grid scroll towards its target. Call once per frame."""
+        diff = self.scroll_target - self.scroll
+        if abs(diff) < 0.5:
+            self.scroll = self.scroll_target
+        else:
+            self.scroll += diff * min(1.0, dt * SCROLL_SPEED)
+
     # ------------- internal helpers -------------
 
     def _wrap_text(self, text: str, max_chars: int = 60):
@@ -41,17 +104,100 @@ class InventoryUI:
             lines.append(current)
         return lines
 
-    def _matches_category(self, stack: ItemStack) -> bool:
-        cat = (stack.item.category or "").lower()
-        cat_id = self.category.lower()
-        if cat_id == "all":
-            return True
-        if cat_id == "other":
-            return cat not in ("weapon", "consumable", "material")
-        return cat == cat_id
+    def _get_filtered_stacks(self, player) -> list[ItemStack]:
+        """Stacks in the current category, cached per inventory version."""
+        key = (id(player.inventory), player.inventory.version, self.category)
+        if key != self._filtered_key:
+            self._filtered = player.inventory.stacks_in_category(self.category)
+            self._filtered_key = key
+        return self._filtered
+
+    def _get_layout(self, screen_size):
+        """Panel geometry, only depends on the screen size."""
+        if screen_size == self._layout_key:
+            return self._layout
 
-    def _get_filtered_stacks(self, player):
-        return [s for s in player.inventory if self._matches_category(s)]
+        screen_w, screen_h = screen_size
+
+        # Big central panel (80% of screen)
+        panel_width = int(screen_w * 0.8)
+        panel_height = int(screen_h * 0.8)
+        panel_x = (screen_w - panel_width) // 2
+        panel_y = (screen_h - panel_height) // 2
+
+        # Everything below is relative to the panel's top-left corner
+        cat_y = 70
+        desc_y = panel_height - DESC_AREA_HEIGHT
+
+        grid_top = cat_y + 40
+        grid_bottom = panel_height - DESC_AREA_HEIGHT - 10
+        grid_width = COLS * ROW_HEIGHT - SLOT_PAD + SCROLLBAR_WIDTH + 8
+
+        self._layout = {
+            "panel": pygame.Rect(panel_x, panel_y, panel_width, panel_height),
+            "cat_y": cat_y,
+            # Scrolling viewport of the item grid, in panel coordinates
+            "grid": pygame.Rect(30, grid_top, grid_width, grid_bottom - grid_top),
+            "desc": pygame.Rect(20, desc_y, panel_width - 40, DESC_AREA_HEIGHT - 20),
+        }
+        self._layout_key = screen_size
+        return self._layout
+
+    # ------------- scrolling -------------
+
+    def _max_scroll(self, count):
+        if self._layout is None:
+            return 0
+        rows = -(-count // COLS)
+        content_height = rows * ROW_HEIGHT - SLOT_PAD
+        return max(0, content_height - self._layout["grid"].height)
+
+    def _rows_per_page(self):
+        if self._layout is None:
+            return 1
+        return max(1, self._layout["grid"].height // ROW_HEIGHT)
+
+    def _scroll_to(self, target, count):
+        self.scroll_target = float(max(0, min(target, self._max_scroll(count))))
+
+    def _ensure_selection_visible(self, count):
+        """Scroll just enough that the selected slot is fully inside the viewport."""
+        if self._layout is None:
+            return
+        view_h = self._layout["grid"].height
+        top = (self.selected_index // COLS) * ROW_HEIGHT
+        bottom = top + SLOT_SIZE
+        if top < self.scroll_target:
+            self._scroll_to(top, count)
+        elif bottom > self.scroll_target + view_h:
+            self._scroll_to(bottom - view_h, count)
+
+    def _visible_slots(self, count):
+        """
+        (rect, index) for the slots in rows that intersect the viewport.
+        Rects are relative to the grid viewport's top-left.
+        """
+        view_h = self._layout["grid"].height
+        scroll = int(self.scroll)
+        first_row = scroll // ROW_HEIGHT
+        last_row = (scroll + view_h) // ROW_HEIGHT
+
+        slots = []
+        for row in range(first_row, last_row + 1):
+            y = row * ROW_HEIGHT - scroll
+            for col in range(COLS):
+                idx = row * COLS + col
+                if idx >= count:
+                    return slots
+                slots.append((pygame.Rect(col * ROW_HEIGHT, y, SLOT_SIZE, SLOT_SIZE), idx))
+        return slots
+
+    def _get_desc_lines(self, item):
+        key = (self._filtered_key, self.selected_index)
+        if key != self._desc_key:
+            self._desc_lines = self._wrap_text(item.description or "No description yet.", max_chars=70)
+            self._desc_key = key
+        return self._desc_lines
 
     # ------------- input handling -------------
 
@@ -61,28 +207,26 @@ class InventoryUI:
             return
 
         # Category hotkeys
-        if key == pygame.K_1:
-            self.category = "all"
-            self.selected_index = 0
-        elif key == pygame.K_2:
-            self.category = "weapon"
-            self.selected_index = 0
-        elif key == pygame.K_3:
-            self.category = "consumable"
-            self.selected_index = 0
-        elif key == pygame.K_4:
-            self.category = "material"
-            self.selected_index = 0
-        elif key == pygame.K_5:
-            self.category = "other"
+        categories = {
+            pygame.K_1: "all",
+            pygame.K_2: "weapon",
+            pygame.K_3: "consumable",
+            pygame.K_4: "material",
+            pygame.K_5: "other",
+        }
+        if key in categories:
+            self.category = categories[key]
             self.selected_index = 0
+            self.scroll = self.scroll_target = 0.0
 
         filtered = self._get_filtered_stacks(player)
         if not filtered:
             self.selected_index = 0
             return
 
-        cols = 6  # number of columns in the grid
+        cols = COLS
+        count = len(filtered)
+        page = self._rows_per_page() * cols
 
         # Move selection
         if key == pygame.K_RIGHT and self.selected_index + 1 < len(filtered):
@@ -94,15 +238,31 @@ class InventoryUI:
         elif key == pygame.K_UP and self.selected_index - cols >= 0:
             self.selected_index -= cols
 
+        # Paging
+        elif key == pygame.K_PAGEDOWN:
+            self.selected_index = min(count - 1, self.selected_index + page)
+        elif key == pygame.K_PAGEUP:
+            self.selected_index = max(0, self.selected_index - page)
+        elif key == pygame.K_HOME:
+            self.selected_index = 0
+        elif key == pygame.K_END:
+            self.selected_index = count - 1
+
         # Use / equip selected
         elif key in (pygame.K_RETURN, pygame.K_SPACE):
             item = filtered[self.selected_index].item
             player.use_item(item)
 
+        self._ensure_selection_visible(count)
+
     def handle_mouse(self, event, player):
-        """Handle mouse clicks (select / use items)."""
+        """Handle mouse clicks (select / use items) and wheel scrolling."""
         if not self.open:
             return
+        if event.type == pygame.MOUSEWHEEL:
+            count = len(self._get_filtered_stacks(player))
+            self._scroll_to(self.scroll_target - event.y * ROW_HEIGHT, count)
+            return
         if event.type != pygame.MOUSEBUTTONDOWN:
             return
 
@@ -121,136 +281,62 @@ class InventoryUI:
 
     # ------------- drawing -------------
 
-    def draw(self, screen, player):
-        """Draw the inventory overlay. No-op if not open."""
-        if not self.open:
-            self.item_slots = []
-            return
-
-        screen_w, screen_h = screen.get_size()
-        filtered = self._get_filtered_stacks(player)
-        if self.selected_index >= len(filtered):
-            self.selected_index = max(0, len(filtered) - 1)
+    def _build_chrome(self, layout, player, filtered):
+        """Compose the panel without the item grid: title, categories, description."""
+        panel_rect = layout["panel"]
+        panel_width, panel_height = panel_rect.size
 
-        # Darken whole screen
-        dim_surface = pygame.Surface((screen_w, screen_h), pygame.SRCALPHA)
-        dim_surface.fill((0, 0, 0, 120))
-        screen.blit(dim_surface, (0, 0))
-
-        # Big central panel (80% of screen)
-        panel_width = int(screen_w * 0.8)
-        panel_height = int(screen_h * 0.8)
-        panel_x = (screen_w - panel_width) // 2
-        panel_y = (screen_h - panel_height) // 2
-
-        panel_surface = pygame.Surface((panel_width, panel_height), pygame.SRCALPHA)
-        panel_surface.fill((15, 15, 25, 230))
-        screen.blit(panel_surface, (panel_x, panel_y))
+        if self._chrome is None or self._chrome.get_size() != panel_rect.size:
+            self._chrome = pygame.Surface(panel_rect.size, pygame.SRCALPHA)
+        panel = self._chrome
+        panel.fill((15, 15, 25, 230))
 
         # Title
         title_text = "Inventory (I to close)"
-        title_surf = self.font.render(title_text, True, (255, 255, 255))
-        title_rect = title_surf.get_rect(midleft=(panel_x + 20, panel_y + 30))
-        screen.blit(title_surf, title_rect)
+        title_surf = render_text(self.font, title_text, (255, 255, 255))
+        title_rect = title_surf.get_rect(midleft=(20, 30))
+        panel.blit(title_surf, title_rect)
 
         # Equipped weapon info (top-right)
         eq_text = f"Equipped weapon: {player.get_equipped_weapon_name()}"
-        eq_surf = self.font_small.render(eq_text, True, (220, 220, 220))
-        eq_rect = eq_surf.get_rect(midright=(panel_x + panel_width - 20, panel_y + 30))
-        screen.blit(eq_surf, eq_rect)
+        eq_surf = render_text(self.font_small, eq_text, (220, 220, 220))
+        eq_rect = eq_surf.get_rect(midright=(panel_width - 20, 30))
+        panel.blit(eq_surf, eq_rect)
 
         # Category bar
-        category_labels = [
-            ("all", "1: All"),
-            ("weapon", "2: Weapons"),
-            ("consumable", "3: Consumables"),
-            ("material", "4: Materials"),
-            ("other", "5: Other"),
-        ]
-        cat_x = panel_x + 20
-        cat_y = panel_y + 70
+        cat_x = 20
+        cat_y = layout["cat_y"]
         cat_spacing = 120
 
-        for cat_id, cat_label in category_labels:
+        for cat_id, cat_label in CATEGORY_LABELS:
             is_active = (cat_id == self.category)
             color = (255, 255, 0) if is_active else (200, 200, 200)
-            cat_surf = self.font_small.render(cat_label, True, color)
-            screen.blit(cat_surf, (cat_x, cat_y))
+            cat_surf = render_text(self.font_small, cat_label, color)
+            panel.blit(cat_surf, (cat_x, cat_y))
             cat_x += cat_spacing
 
         pygame.draw.line(
-            screen,
+            panel,
             (80, 80, 120),
-            (panel_x + 15, cat_y + 24),
-            (panel_x + panel_width - 15, cat_y + 24),
+            (15, cat_y + 24),
+            (panel_width - 15, cat_y + 24),
             2,
         )
 
-        # Grid of item slots
-        self.item_slots = []  # rebuild each frame
-
-        slot_size = 64
-        slot_pad = 10
-        cols = 6
-        desc_area_height = 120
-
-        grid_x = panel_x + 30
-        grid_y = cat_y + 40
-        max_grid_bottom = panel_y + panel_height - desc_area_height - 10
-
         if not filtered:
             msg = "(no items in this category)"
-            msg_surf = self.font.render(msg, True, (200, 200, 200))
-            screen.blit(msg_surf, (grid_x, grid_y))
+            msg_surf = render_text(self.font, msg, (200, 200, 200))
+            panel.blit(msg_surf, layout["grid"].topleft)
         else:
-            for idx, stack in enumerate(filtered):
-                row = idx // cols
-                col = idx % cols
-
-                x = grid_x + col * (slot_size + slot_pad)
-                y = grid_y + row * (slot_size + slot_pad)
-
-                rect = pygame.Rect(x, y, slot_size, slot_size)
-                if rect.bottom > max_grid_bottom:
-                    break
-
-                self.item_slots.append((rect, idx))
-
-                # Background
-                pygame.draw.rect(screen, (30, 30, 45), rect)
-
-                # Border color
-                border_color = (120, 120, 160)
-                if player.equipped_weapon is not None and stack.item is player.equipped_weapon:
-                    border_color = (80, 200, 120)  # equipped
-                if idx == self.selected_index:
-                    border_color = (255, 255, 0)    # selected
-
-                pygame.draw.rect(screen, border_color, rect, 2)
-
-                # Item name (shortened) and quantity
-                name = stack.item.name
-                if len(name) > 8:
-                    name = name[:7] + "…"
-
-                name_surf = self.font_small.render(name, True, (230, 230, 230))
-                name_rect = name_surf.get_rect(center=(rect.centerx, rect.y + 14))
-                screen.blit(name_surf, name_rect)
-
-                qty_text = f"x{stack.amount}"
-                qty_surf = self.font_small.render(qty_text, True, (200, 200, 200))
-                qty_rect = qty_surf.get_rect(bottomright=(rect.right - 4, rect.bottom - 4))
-                screen.blit(qty_surf, qty_rect)
+            count_text = f"{len(filtered)} stacks"
+            count_surf = render_text(self.font_small, count_text, (160, 160, 180))
+            panel.blit(count_surf, count_surf.get_rect(topright=(panel_width - 20, cat_y)))
 
         # --- Description box at the bottom ---
-        desc_x = panel_x + 20
-        desc_y = panel_y + panel_height - desc_area_height
-        desc_w = panel_width - 40
-        desc_h = desc_area_height - 20
-
-        desc_rect = pygame.Rect(desc_x, desc_y, desc_w, desc_h)
-        pygame.draw.rect(screen, (25, 25, 40), desc_rect)
-        pygame.draw.rect(screen, (80, 80, 120), desc_rect, 2)
+        desc_rect = layout["desc"]
+        desc_x, desc_y, desc_w, desc_h = desc_rect
+        pygame.draw.rect(panel, (25, 25, 40), desc_rect)
+        pygame.draw.rect(panel, (80, 80, 120), desc_rect, 2)
 
         inner_x = desc_x + 10
         inner_y = desc_y + 10
@@ -267,27 +353,150 @@ class InventoryUI:
             if player.equipped_weapon is not None and item is player.equipped_weapon:
                 cat_line += "  (Equipped)"
 
-            desc_lines = self._wrap_text(item.description or "No description yet.", max_chars=70)
+            desc_lines = self._get_desc_lines(item)
 
             y = inner_y
-            title_surf = self.font.render(title_line, True, (255, 255, 255))
-            screen.blit(title_surf, (inner_x, y))
+            title_surf = render_text(self.font, title_line, (255, 255, 255))
+            panel.blit(title_surf, (inner_x, y))
             y += 26
 
-            cat_surf = self.font_small.render(cat_line, True, (210, 210, 210))
-            screen.blit(cat_surf, (inner_x, y))
+            cat_surf = render_text(self.font_small, cat_line, (210, 210, 210))
+            panel.blit(cat_surf, (inner_x, y))
             y += 24
 
             for line in desc_lines:
                 if y > desc_y + desc_h - 30:
                     break
-                line_surf = self.font_small.render(line, True, (200, 200, 200))
-                screen.blit(line_surf, (inner_x, y))
+                line_surf = render_text(self.font_small, line, (200, 200, 200))
+                panel.blit(line_surf, (inner_x, y))
                 y += 20
 
-        hint_text = "Right-click or Enter/Space to equip/use.  1–5 to change category."
-        hint_surf = self.font_small.render(hint_text, True, (180, 180, 200))
+        hint_surf = render_text(self.font_small, HINT_TEXT, (180, 180, 200))
         hint_rect = hint_surf.get_rect(
             bottomright=(desc_x + desc_w - 10, desc_y + desc_h - 4)
         )
-        screen.blit(hint_surf, hint_rect)
+        panel.blit(hint_surf, hint_rect)
+
+    def _build_grid(self, layout, player, filtered, slots):
+        """Draw the visible slots and the scrollbar into the grid viewport surface."""
+        view = layout["grid"]
+        if self._grid is None or self._grid.get_size() != view.size:
+            self._grid = pygame.Surface(view.size, pygame.SRCALPHA)
+        grid = self._grid
+        grid.fill((0, 0, 0, 0))
+
+        equipped = player.equipped_weapon
+        icon_blits = []
+        for rect, idx in slots:
+            stack = filtered[idx]
+
+            # Background
+            pygame.draw.rect(grid, (30, 30, 45), rect)
+
+            # Border color
+            border_color = (120, 120, 160)
+            if equipped is not None and stack.item is equipped:
+                border_color = (80, 200, 120)  # equipped
+            if idx == self.selected_index:
+                border_color = (255, 255, 0)    # selected
+
+            pygame.draw.rect(grid, border_color, rect, 2)
+
+            # Category icon, bottom left (all slots go out in one blits() below)
+            if self.icons is not None:
+                icon = self.icons.get(("icon", stack.item.category))
+                if icon is not None:
+                    pos = (rect.x + 5, rect.bottom - 5 - icon.area.height)
+                    icon_blits.append((icon.surface, pos, icon.area))
+
+            # Item name (shortened) and quantity
+            name = stack.item.name
+            if len(name) > 8:
+                name = name[:7] + "…"
+
+            name_surf = render_text(self.font_small, name, (230, 230, 230))
+            name_rect = name_surf.get_rect(center=(rect.centerx, rect.y + 14))
+            grid.blit(name_surf, name_rect)
+
+            qty_text = f"x{stack.amount}"
+            qty_surf = render_text(self.font_small, qty_text, (200, 200, 200))
+            qty_rect = qty_surf.get_rect(bottomright=(rect.right - 4, rect.bottom - 4))
+            grid.blit(qty_surf, qty_rect)
+
+        grid.blits(icon_blits, doreturn=False)
+
+        # Scrollbar, only when there is something to scroll
+        max_scroll = self._max_scroll(len(filtered))
+        if max_scroll > 0:
+            track = pygame.Rect(view.width - SCROLLBAR_WIDTH, 0, SCROLLBAR_WIDTH, view.height)
+            pygame.draw.rect(grid, (40, 40, 60), track)
+            thumb_h = max(20, int(view.height * view.height / (view.height + max_scroll)))
+            thumb_y = int((view.height - thumb_h) * min(1.0, self.scroll / max_scroll))
+            pygame.draw.rect(grid, (140, 140, 180), (track.x, thumb_y, SCROLLBAR_WIDTH, thumb_h))
+
+    def draw(self, screen, player):
+        """
+        Draw the inventory overlay. No-op if not open.
+        Returns the screen rects that changed since the last draw.
+        """
+        if not self.open:
+            # item_slots stay as they are: they are only hit-tested while open,
+            # and reopening with nothing changed reuses the cached grid
+            if self._last_state is not None:
+                self._last_state = None
+                return [screen.get_rect()]
+            return []
+
+        screen_size = screen.get_size()
+        filtered = self._get_filtered_stacks(player)
+        count = len(filtered)
+        if self.selected_index >= count:
+            self.selected_index = max(0, count - 1)
+
+        layout = self._get_layout(screen_size)
+        panel_rect = layout["panel"]
+
+        # The list may have shrunk, or the screen grown, under the scroll position
+        max_scroll = self._max_scroll(count)
+        if self.scroll_target > max_scroll:
+            self.scroll_target = float(max_scroll)
+        if self.scroll > max_scroll:
+            self.scroll = float(max_scroll)
+
+        # Rebuild the chrome / grid only when something they show changed
+        chrome_state = (
+            self._filtered_key,
+            self.selected_index,
+            id(player.equipped_weapon),
+            screen_size,
+        )
+        state = chrome_state + (int(self.scroll),)
+        was_open = self._last_state is not None
+        changed = state != self._last_state
+        self._last_state = state
+
+        if chrome_state != self._chrome_key:
+            self._build_chrome(layout, player, filtered)
+            self._chrome_key = chrome_state
+
+        if state != self._grid_key:
+            slots = self._visible_slots(count)
+            self._build_grid(layout, player, filtered, slots)
+            self._grid_key = state
+
+            # Hit-test rects in screen coordinates, clipped to the viewport
+            view = layout["grid"].move(panel_rect.topleft)
+            self.item_slots = []
+            for rect, idx in slots:
+                hit = rect.move(view.topleft).clip(view)
+                if hit.height > 0:
+                    self.item_slots.append((hit, idx))
+
+        screen.blit(self._chrome, panel_rect.topleft)
+        screen.blit(self._grid, layout["grid"].move(panel_rect.topleft).topleft)
+
+        if not was_open:
+            return [screen.get_rect()]
+        if changed:
+            return [panel_rect.copy()]
+        return []
@@ -0,0 +1,261 @@
+# itemdb.py
+"""
+Compiled item definitions, read through mmap.
+
+Item definitions are compiled offline into one indexed binary file:
+
+    python itemdb.py                         # ITEM_DEFS -> ../data/items.idb
+    python itemdb.py --source more_items.json
+
+At runtime ItemDB maps the file and decodes a definition only when it is
+first asked for, so opening a catalog of 50,000 items costs the same as
+opening one of 5. Decoded templates are kept in a small LRU cache, and for
+as long as any Item still uses them, so one id never gets two templates.
+
+The header holds a checksum of the ITEM_DEFS the file was compiled from.
+TemplateCatalog ignores a database built from other ITEM_DEFS, so a stale
+build can't override edits to them.
+
+File layout (little-endian):
+
+    header   magic, version, count, index offset, ITEM_DEFS checksum
+    records  damage, heal_amount, value, stackable, max_stack,
+             then template_id, name, category, description (u16 length + utf-8)
+    index    count x u32 record offsets, sorted by template_id
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import threading
+import weakref
+import zlib
+from collections import OrderedDict
+
+from items import ItemTemplate, ITEM_DEFS, ITEM_DB_PATH
+
+MAGIC = b"LIDB"
+DB_VERSION = 2
+
+HEADER = struct.Struct("<4sHxxIII")
+RECORD = struct.Struct("<iiiBI")
+STRING_LEN = struct.Struct("<H")
+OFFSET = struct.Struct("<I")
+
+CACHE_SIZE = 1024   # decoded templates kept around
+
+
+class ItemDBError(ValueError):
+    """Not an item database, or one from a newer version of the game."""
+
+
+# -----------------------------
+# Compiling
+# -----------------------------
+def _pack_string(text):
+    data = text.encode("utf-8")
+    return STRING_LEN.pack(len(data)) + data
+
+
+def defs_checksum(defs) -> int:
+    """CRC32 of item definitions ({template_id: {field: value}}), key order independent."""
+    return zlib.crc32(json.dumps(defs, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+
+
+def compile_item_db(defs, path, source_defs=ITEM_DEFS):
+    """
+    Write {template_id: {field: value}} as an item database at path.
+    source_defs are the ITEM_DEFS it is built on; their checksum goes in the header.
+    """
+    records = bytearray()
+    offsets = {}
+    for template_id in sorted(defs, key=lambda key: key.encode("utf-8")):
+        data = defs[template_id]
+        offsets[template_id] = HEADER.size + len(records)
+        records += RECORD.pack(
+            data.get("damage", 0),
+            data.get("heal_amount", 0),
+            data.get("value", 0),
+            bool(data.get("stackable", True)),
+            data.get("max_stack", 99),
+        )
+        for text in (template_id, data["name"], data["category"], data.get("description", "")):
+            records += _pack_string(text)
+
+    index_offset = HEADER.size + len(records)
+    index = b"".join(OFFSET.pack(offset) for offset in offsets.values())
+
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, DB_VERSION, len(offsets), index_offset, defs_checksum(source_defs)))
+        f.write(records)
+        f.write(index)
+    os.replace(tmp, path)
+    return len(offsets)
+
+
+# -----------------------------
+# Reading
+# -----------------------------
+class ItemDB:
+    """
+    Read-only view of a compiled item database.
+
+        db = ItemDB.open("../data/items.idb")
+        template = db.get("rusty_sword")     # ItemTemplate or None
+    """
+
+    def __init__(self, path, cache_size=CACHE_SIZE):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # mmap can't map an empty file
+            self._file.close()
+            raise ItemDBError(f"{path} is empty")
+
+        if len(self._map) < HEADER.size:
+            self.close()
+            raise ItemDBError(f"{path} is truncated")
+        magic, version, self.count, self._index_offset, self.source_checksum = \
+            HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            self.close()
+            raise ItemDBError(f"{path} is not an item database")
+        if version > DB_VERSION:
+            self.close()
+            raise ItemDBError(f"{path} is version {version}, newer than this game ({DB_VERSION})")
+        if version < DB_VERSION:
+            self.close()
+            raise ItemDBError(f"{path} is version {version}, recompile it with python itemdb.py")
+
+        self.cache_size = cache_size
+        self._cache = OrderedDict()   # template_id -> ItemTemplate
+        # Every decoded template still in use, evicted from _cache or not
+        self._live = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()   # get() runs on the save thread too
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def open(cls, path=ITEM_DB_PATH):
+        """The database at path, or None if there isn't a usable one."""
+        if not os.path.exists(path):
+            return None
+        try:
+            return cls(path)
+        except (OSError, ItemDBError) as e:
+            print(f"Could not open item database {path}: {e}")
+            return None
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __len__(self):
+        return self.count
+
+    # ------------- lookups -------------
+
+    def _string(self, pos):
+        (size,) = STRING_LEN.unpack_from(self._map, pos)
+        start = pos + STRING_LEN.size
+        return self._map[start:start + size], start + size
+
+    def _record_offset(self, index):
+        return OFFSET.unpack_from(self._map, self._index_offset + index * OFFSET.size)[0]
+
+    def _key_at(self, index):
+        key, _end = self._string(self._record_offset(index) + RECORD.size)
+        return key
+
+    def _find(self, key: bytes):
+        """Record offset for this template_id (binary search over the index), or None."""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self._key_at(lo) == key:
+            return self._record_offset(lo)
+        return None
+
+    def _decode(self, offset):
+        damage, heal_amount, value, stackable, max_stack = RECORD.unpack_from(self._map, offset)
+        pos = offset + RECORD.size
+        strings = []
+        for _ in range(4):
+            text, pos = self._string(pos)
+            strings.append(text.decode("utf-8"))
+        template_id, name, category, description = strings
+        return ItemTemplate(
+            template_id, name, category, description,
+            damage=damage, heal_amount=heal_amount, value=value,
+            stackable=bool(stackable), max_stack=max_stack,
+        )
+
+    def get(self, template_id, default=None):
+        with self._lock:
+            template = self._cache.get(template_id)
+            if template is not None:
+                self._cache.move_to_end(template_id)
+                self.hits += 1
+                return template
+
+            template = self._live.get(template_id)
+            if template is not None:
+                # Evicted, but Items still share it: don't build a second one
+                self.hits += 1
+            else:
+                self.misses += 1
+                offset = self._find(template_id.encode("utf-8"))
+                if offset is None:
+                    return default
+                template = self._live[template_id] = self._decode(offset)
+            self._cache[template_id] = template
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return template
+
+    def __contains__(self, template_id):
+        return self._find(template_id.encode("utf-8")) is not None
+
+    def ids(self):
+        """Every template_id, in sorted order (reads the whole index)."""
+        for index in range(self.count):
+            yield bytes(self._key_at(index)).decode("utf-8")
+
+    def stats(self):
+        return {"items": self.count, "cached": len(self._cache),
+                "hits": self.hits, "misses": self.misses}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile item definitions into an item database")
+    parser.add_argument("--source", action="append", default=[],
+                        help="JSON file of {template_id: {field: value}} (repeatable); "
+                             "added on top of items.ITEM_DEFS")
+    parser.add_argument("-o", "--output", default=ITEM_DB_PATH)
+    args = parser.parse_args()
+
+    defs = dict(ITEM_DEFS)
+    for source in args.source:
+        with open(source, encoding="utf-8") as f:
+            defs.update(json.load(f))
+
+    count = compile_item_db(defs, args.output, source_defs=ITEM_DEFS)
+    print(f"Wrote {count} item definitions to {args.output} ({os.path.getsize(args.output)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,33 @@
 # items.py
-import uuid
+import threading
+
+from uids import UidAllocator, CounterAllocator
+
+# Fields every item gets from its template
+TEMPLATE_FIELDS = (
+    "name",
+    "category",
+    "description",
+    "damage",
+    "heal_amount",
+    "value",
+    "stackable",
+    "max_stack",
+)
+
+
+class ItemTemplate:
+    """
+    Everything that is the same for all items of one kind (rusty_sword, ...).
+    Built from ITEM_DEFS or the item database on first use, and shared by
+    the Items of that kind.
+    Immutable.
+    """
+    __slots__ = ("template_id", "__weakref__") + TEMPLATE_FIELDS
 
-class Item:
     def __init__(
         self,
-        template_id: str,     # rusty_sword, slime_goo, etc.
-        unique_id: str,       # actual instance ID
+        template_id: str,
         name: str,
         category: str,
         description: str = "",
@@ -15,16 +37,64 @@ class Item:
         stackable: bool = True,
         max_stack: int = 99,
     ):
-        self.template_id = template_id
-        self.unique_id = unique_id
-        self.name = name
-        self.category = category
-        self.description = description
-        self.damage = damage
-        self.heal_amount = heal_amount
-        self.value = value
-        self.stackable = stackable
-        self.max_stack = max_stack
+        set_field = object.__setattr__
+        set_field(self, "template_id", template_id)
+        set_field(self, "name", name)
+        set_field(self, "category", category)
+        set_field(self, "description", description)
+        set_field(self, "damage", damage)
+        set_field(self, "heal_amount", heal_amount)
+        set_field(self, "value", value)
+        set_field(self, "stackable", stackable)
+        set_field(self, "max_stack", max_stack)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("ItemTemplate is immutable")
+
+    def __repr__(self):
+        return f"ItemTemplate({self.template_id!r})"
+
+
+def _template_field(field):
+    """Item attribute that reads the per-instance override, else the template."""
+    def get(self):
+        overrides = self.overrides
+        if overrides is not None and field in overrides:
+            return overrides[field]
+        return getattr(self.template, field)
+
+    def set(self, value):
+        if self.overrides is None:
+            self.overrides = {}
+        self.overrides[field] = value
+
+    return property(get, set)
+
+
+class Item:
+    """
+    One actual item: a shared template, an id, and only the fields
+    that differ from the template (e.g. a renamed weapon).
+    """
+    __slots__ = ("template", "unique_id", "overrides")
+
+    def __init__(self, template: ItemTemplate, unique_id, **overrides):
+        self.template = template
+        self.unique_id = unique_id        # actual instance ID
+        self.overrides = overrides or None
+
+    @property
+    def template_id(self) -> str:         # rusty_sword, slime_goo, etc.
+        return self.template.template_id
+
+    name = _template_field("name")
+    category = _template_field("category")
+    description = _template_field("description")
+    damage = _template_field("damage")
+    heal_amount = _template_field("heal_amount")
+    value = _template_field("value")
+    stackable = _template_field("stackable")
+    max_stack = _template_field("max_stack")
 
 
 class ItemStack:
@@ -109,30 +179,119 @@ ITEM_DEFS = {
     },
 }
 
+# Compiled item definitions (python itemdb.py). Optional: without it
+# only ITEM_DEFS above is available. Entries in it win over ITEM_DEFS, but
+# a database compiled from different ITEM_DEFS is ignored until recompiled.
+ITEM_DB_PATH = "../data/items.idb"
+
+
+class TemplateCatalog:
+    """
+    template_id -> shared ItemTemplate.
+
+    Looks in the compiled item database first (opened on the first lookup),
+    then in ITEM_DEFS. Templates are only built when first asked for.
+
+    Thread safe: the save thread looks templates up while it compacts the
+    autosave journal, at the same time as the game creates items.
+    """
+
+    def __init__(self, defs, db_path=ITEM_DB_PATH):
+        self.defs = defs
+        self.db_path = db_path
+        self._db = None
+        self._db_checked = False
+        self._local = {}   # template_id -> ItemTemplate built from defs
+        self._lock = threading.Lock()
+
+    @property
+    def db(self):
+        if not self._db_checked:
+            with self._lock:
+                if not self._db_checked:
+                    if self.db_path:
+                        self._db = self._open_db()
+                    self._db_checked = True
+        return self._db
+
+    def _open_db(self):
+        from itemdb import ItemDB, defs_checksum   # only needed when there is a database
+
+        db = ItemDB.open(self.db_path)
+        if db is not None and db.source_checksum != defs_checksum(self.defs):
+            print(f"Ignoring item database {self.db_path}: ITEM_DEFS changed since it "
+                  f"was compiled (run python itemdb.py)")
+            db.close()
+            db = None
+        return db
+
+    def use_db(self, db):
+        """Swap in another ItemDB (or None for ITEM_DEFS only)."""
+        with self._lock:
+            self._db = db
+            self._db_checked = True
+
+    def get(self, template_id, default=None):
+        db = self.db
+        if db is not None:
+            template = db.get(template_id)   # ItemDB locks its own cache
+            if template is not None:
+                return template
+
+        template = self._local.get(template_id)
+        if template is None:
+            with self._lock:
+                # Build each template once, even if two threads ask at once
+                template = self._local.get(template_id)
+                if template is None:
+                    data = self.defs.get(template_id)
+                    if data is None:
+                        return default
+                    template = self._local[template_id] = ItemTemplate(template_id, **data)
+        return template
+
+    def __getitem__(self, template_id):
+        template = self.get(template_id)
+        if template is None:
+            raise KeyError(template_id)
+        return template
+
+    def __contains__(self, template_id):
+        return self.get(template_id) is not None
+
+
+# One shared template per definition, built on first use
+TEMPLATES = TemplateCatalog(ITEM_DEFS)
+
+
+# Where new unique ids come from; swap with set_uid_allocator()
+_uid_allocator: UidAllocator = CounterAllocator()
+
+
+def set_uid_allocator(allocator: UidAllocator):
+    """Install a different id allocator (e.g. CounterAllocator(prefix=worker_id))."""
+    global _uid_allocator
+    _uid_allocator = allocator
+
+
+def get_uid_allocator() -> UidAllocator:
+    return _uid_allocator
+
+
 def generate_uid():
-    return str(uuid.uuid4())
+    return _uid_allocator.allocate()
 
 
-def create_item(item_id: str) -> Item:
+def create_item(item_id: str, **overrides) -> Item:
     """
     Factory function:
       create_item("slime_goo") -> new Item instance
+      create_item("stick", name="Lucky Stick") -> with a per-item override
     """
-    if item_id not in ITEM_DEFS:
+    template = TEMPLATES.get(item_id)
+    if template is None:
         raise ValueError(f"Unknown item_id: {item_id}")
 
-    data = ITEM_DEFS[item_id]
-    return Item(
-        template_id=item_id,
-        unique_id=generate_uid(),
-        name=data["name"],
-        category=data["category"],
-        description=data["description"],
-        damage=data["damage"],
-        heal_amount=data["heal_amount"],
-        value=data["value"],
-        stackable=data["stackable"],
-        max_stack=data["max_stack"],
-    )
+    return Item(template, generate_uid(), **overrides)
 
 
@@ -0,0 +1,343 @@
+# journal.py
+"""
+Incremental autosave.
+
+Instead of rewriting the whole save every few seconds, Autosave appends small
+records to a journal next to the save file:
+
+    quicksave.sav            full snapshot (savegame format)
+    quicksave.sav.journal    changes since that snapshot
+
+Inventory changes come from the inventory's listeners; equip changes and
+the player's position / HP are picked up in tick(). Records are buffered in
+memory and handed to the save thread in batches. Every so often the save
+thread compacts: it loads the snapshot, replays the journal onto it, writes a
+new snapshot and starts an empty journal. The main thread never encodes the
+whole state: a full snapshot (first save, inventory replaced) only copies
+the stacks into a SaveSnapshot there and is encoded on the save thread.
+
+The journal header holds the CRC32 of the snapshot it belongs to. A journal
+left over from an older snapshot (e.g. a crash during compaction) is ignored.
+"""
+
+import json
+import os
+import struct
+import zlib
+
+from items import Item, TEMPLATES
+from savegame import (
+    SaveError, saver, encode_save, encode_snapshot, take_snapshot,
+    decode_save, pack_save, read_save, write_atomic,
+)
+
+JOURNAL_MAGIC = b"LJNL"
+JOURNAL_VERSION = 2
+# magic, version, crc32 of the snapshot body this journal continues
+JOURNAL_HEADER = struct.Struct("<4sHI")
+# kind, payload length (item overrides can be any size)
+RECORD = struct.Struct("<BI")
+# Version 1 journals: payloads up to 64 KB
+RECORD_V1 = struct.Struct("<BH")
+
+# Record kinds
+REC_ADD = 1        # amount, uid lo, uid hi, template, [overrides json]
+REC_REMOVE = 2     # amount, template
+REC_EQUIP = 3      # has item, [uid lo, uid hi, template, overrides json]
+REC_PLAYER = 4     # x, y, hp
+
+ADD = struct.Struct("<IQQB")
+REMOVE = struct.Struct("<I")
+EQUIP = struct.Struct("<BQQB")
+PLAYER_STATE = struct.Struct("<ddi")
+
+_U64_MASK = (1 << 64) - 1
+
+POSITION_INTERVAL = 0.5    # seconds between position records (if moved)
+FLUSH_INTERVAL = 2.0       # seconds between handing records to the save thread
+COMPACT_INTERVAL = 60.0    # seconds between compactions
+COMPACT_BYTES = 256 * 1024  # ... or sooner once the journal is this big
+
+
+def journal_path(save_path):
+    return save_path + ".journal"
+
+
+# -----------------------------
+# Records
+# -----------------------------
+def _record(out, kind, payload):
+    out += RECORD.pack(kind, len(payload))
+    out += payload
+
+
+def _item_payload(struct_, prefix, item):
+    """struct_ packs (*prefix, uid lo, uid hi, template length); template and overrides follow."""
+    template = item.template_id.encode("utf-8")
+    uid = item.unique_id
+    payload = struct_.pack(*prefix, uid & _U64_MASK, uid >> 64, len(template)) + template
+    if item.overrides:
+        payload += json.dumps(item.overrides, separators=(",", ":")).encode("utf-8")
+    return payload
+
+
+def _find_item(player, uid, template_id, overrides):
+    """The in-game Item with this uid, or a new one (same as loading a save)."""
+    stacks = player.inventory.stacks_for_uid(uid)
+    if stacks:
+        return stacks[0].item
+    equipped = player.equipped_weapon
+    if equipped is not None and equipped.unique_id == uid:
+        return equipped
+    template = TEMPLATES.get(template_id)
+    if template is None:
+        raise SaveError(f"Journal uses an unknown item: {template_id}")
+    return Item(template, uid, **overrides)
+
+
+def _read_item(payload, offset, template_len):
+    template_id = bytes(payload[offset:offset + template_len]).decode("utf-8")
+    rest = bytes(payload[offset + template_len:])
+    overrides = json.loads(rest.decode("utf-8")) if rest else {}
+    return template_id, overrides
+
+
+def iter_records(data, record=RECORD):
+    """(kind, payload) for every complete record; a torn last record is dropped."""
+    view = memoryview(data)
+    pos = 0
+    while pos + record.size <= len(view):
+        kind, size = record.unpack_from(view, pos)
+        start = pos + record.size
+        if start + size > len(view):
+            break
+        yield kind, view[start:start + size]
+        pos = start + size
+
+
+def replay(player, data, record=RECORD):
+    """Apply journal records (without the header) to a loaded player."""
+    inventory = player.inventory
+    for kind, payload in iter_records(data, record):
+        if kind == REC_ADD:
+            amount, lo, hi, template_len = ADD.unpack_from(payload)
+            template_id, overrides = _read_item(payload, ADD.size, template_len)
+            inventory.add(_find_item(player, lo | hi << 64, template_id, overrides), amount)
+        elif kind == REC_REMOVE:
+            (amount,) = REMOVE.unpack_from(payload)
+            inventory.remove(bytes(payload[REMOVE.size:]).decode("utf-8"), amount)
+        elif kind == REC_EQUIP:
+            has_item, lo, hi, template_len = EQUIP.unpack_from(payload)
+            if has_item:
+                template_id, overrides = _read_item(payload, EQUIP.size, template_len)
+                player.equipped_weapon = _find_item(player, lo | hi << 64, template_id, overrides)
+            else:
+                player.equipped_weapon = None
+        elif kind == REC_PLAYER:
+            player.x, player.y, player.hp = PLAYER_STATE.unpack_from(payload)
+            player.prev_x, player.prev_y = player.x, player.y
+        else:
+            raise SaveError(f"Unknown journal record {kind}")
+
+
+def _read_journal(path, base_crc):
+    """
+    (records, record struct) of the journal for the snapshot with this CRC;
+    records are b"" if there are none.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return b"", RECORD
+    if len(data) < JOURNAL_HEADER.size:
+        return b"", RECORD
+    magic, version, crc = JOURNAL_HEADER.unpack_from(data)
+    if magic != JOURNAL_MAGIC or version > JOURNAL_VERSION or crc != base_crc:
+        return b"", RECORD
+    return data[JOURNAL_HEADER.size:], RECORD_V1 if version == 1 else RECORD
+
+
+def load_journaled(save_path, observe=True):
+    """(player, settings): the snapshot with its journal replayed on top."""
+    body = read_save(save_path)
+    player, settings = decode_save(body, observe=observe)
+    replay(player, *_read_journal(journal_path(save_path), zlib.crc32(body)))
+    return player, settings
+
+
+# -----------------------------
+# Save thread jobs
+# -----------------------------
+def _write_base(save_path, body, compress):
+    """New snapshot, then an empty journal that continues it."""
+    write_atomic(save_path, pack_save(body, compress))
+    write_atomic(journal_path(save_path),
+                 JOURNAL_HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION, zlib.crc32(body)))
+
+
+def _write_snapshot(save_path, snapshot, compress):
+    _write_base(save_path, encode_snapshot(snapshot), compress)
+
+
+def _append(save_path, chunk):
+    with open(journal_path(save_path), "ab") as f:
+        f.write(chunk)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _compact(save_path, settings, compress):
+    # Runs on the save thread: must not touch the live game objects,
+    # nor the uid allocator the main thread is using. Template lookups are
+    # fine, TEMPLATES and its ItemDB lock around them.
+    player, _old_settings = load_journaled(save_path, observe=False)
+    _write_base(save_path, encode_save(player, settings), compress)
+
+
+class Autosave:
+    """
+    Journals one player's changes to save_path.
+
+        autosave = Autosave(player, settings, SAVE_PATH)
+        ...
+        autosave.tick(dt)     # every frame
+        ...
+        autosave.close()      # leaving the game
+
+    Starting writes a full snapshot (copied here, encoded and written on the
+    save thread); after that the main thread only packs small records.
+
+    With start=False (a new game) the save file is left alone until the
+    player saves (flush()) or leaves (close()), so starting a new game
+    doesn't overwrite the old save.
+    """
+
+    def __init__(self, player, settings, save_path, compress=True, start=True):
+        self.player = player
+        self.settings = settings
+        self.save_path = save_path
+        self.compress = compress
+
+        self._buffer = bytearray()
+        self._journal_bytes = 0
+        self._since_position = 0.0
+        self._since_flush = 0.0
+        self._since_compact = 0.0
+        self._last_player_state = None
+        self._last_equipped = player.equipped_weapon
+        self._needs_snapshot = False
+        self._started = False
+        self._closed = False
+
+        if start:
+            self.start()
+
+    def start(self):
+        """Write the first snapshot and journal changes from there on."""
+        if self._started:
+            return
+        self._started = True
+        self.player.inventory.subscribe(self._on_inventory)
+        self.snapshot()
+
+    # ------------- recording -------------
+
+    def _on_inventory(self, inventory, ops):
+        out = self._buffer
+        for op, item, amount in ops:
+            if op == "add":
+                _record(out, REC_ADD, _item_payload(ADD, (amount,), item))
+            elif op == "remove":
+                _record(out, REC_REMOVE, REMOVE.pack(amount) + item.encode("utf-8"))
+            else:
+                # Whole inventory replaced: only a new snapshot can describe that
+                self._needs_snapshot = True
+
+    def _record_player(self):
+        player = self.player
+        equipped = player.equipped_weapon
+        if equipped is not self._last_equipped:
+            self._last_equipped = equipped
+            if equipped is None:
+                _record(self._buffer, REC_EQUIP, EQUIP.pack(0, 0, 0, 0))
+            else:
+                _record(self._buffer, REC_EQUIP, _item_payload(EQUIP, (1,), equipped))
+
+        state = (player.x, player.y, player.hp)
+        if state != self._last_player_state:
+            self._last_player_state = state
+            _record(self._buffer, REC_PLAYER, PLAYER_STATE.pack(*state))
+
+    # ------------- per frame -------------
+
+    def tick(self, dt):
+        """Call once per frame. Cheap: packs a few bytes, hands them off now and then."""
+        if self._closed or not self._started:
+            return
+        if self._needs_snapshot:
+            self.snapshot()
+            return
+
+        # Equip changes are rare and matter, check them every frame
+        if self.player.equipped_weapon is not self._last_equipped:
+            self._record_player()
+
+        self._since_position += dt
+        if self._since_position >= POSITION_INTERVAL:
+            self._since_position = 0.0
+            self._record_player()
+
+        self._since_flush += dt
+        if self._since_flush >= FLUSH_INTERVAL:
+            self.flush()
+
+        self._since_compact += dt
+        if self._since_compact >= COMPACT_INTERVAL or self._journal_bytes >= COMPACT_BYTES:
+            self.compact()
+
+    def flush(self):
+        """Hand everything recorded so far to the save thread."""
+        if not self._started:
+            self.start()   # the first snapshot already has everything
+            return
+        self._since_flush = 0.0
+        self._record_player()
+        if not self._buffer:
+            return
+        chunk = bytes(self._buffer)
+        self._buffer.clear()
+        self._journal_bytes += len(chunk)
+        saver.submit(_append, self.save_path, chunk)
+
+    def compact(self):
+        """Fold the journal into a new snapshot, on the save thread."""
+        if not self._started:
+            self.start()
+            return
+        self.flush()
+        self._since_compact = 0.0
+        self._journal_bytes = 0
+        saver.submit(_compact, self.save_path, dict(self.settings), self.compress)
+
+    def snapshot(self):
+        """Write a full snapshot of the current state (copies it on this thread)."""
+        self._buffer.clear()
+        self._needs_snapshot = False
+        self._since_compact = 0.0
+        self._journal_bytes = 0
+        self._last_equipped = self.player.equipped_weapon
+        self._last_player_state = None
+        saver.submit(_write_snapshot, self.save_path,
+                     take_snapshot(self.player, self.settings), self.compress)
+
+    def close(self):
+        """Stop journaling; everything recorded is compacted into the save."""
+        if self._closed:
+            return
+        self._closed = True
+        if not self._started:
+            self.snapshot()   # never saved yet: leaving saves, like F5 would
+            return
+        self.player.inventory.unsubscribe(self._on_inventory)
+        self.compact()
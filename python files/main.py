@@ -1,28 +1,63 @@
 import sys
 import pygame
 from graphs import Button, get_screen_resolution
-from functions import start_game
+from text_cache import get_font
+from assets import assets
+from transitions import Fade
+
+# The game itself (functions, engine, world_map, savegame, ...) is only
+# imported once it's needed, so the menu comes up without it.
+# benchmarks.py importtime checks that this stays true.
+
+SPLASH_PATH = "../pngs/splash.png"
+
+# Fade durations in seconds
+SPLASH_FADE = 0.6
+MENU_FADE = 0.35
 
 def quit_game():
     print("Exiting game...")
+    assets.shutdown()
+    savegame = sys.modules.get("savegame")
+    if savegame is not None:
+        savegame.saver.shutdown()   # let a pending save finish writing
     pygame.quit()
     sys.exit()
 
 
-def fade_out(screen, color=(0, 0, 0), speed=5):
-    #Simple fade-out transition effect.
-    fade_surface = pygame.Surface(screen.get_size())
-    fade_surface.fill(color)
+def queue_startup_assets():
+    """Everything the menu and the game need before we leave the splash screen."""
+    # Font lookups scan the system font list, keep that off the main thread.
+    # They open one at a time (text_cache.FONT_LOCK); the world map runs beside them.
+    for size in (60, 32, 24):
+        assets.submit(f"georgia {size}", get_font, "georgia", size, required=True)
+    for size in (24, 20):
+        assets.submit(f"default font {size}", get_font, None, size, required=True)
+
+    # Cut the world map into chunks (only slow the first time)
+    assets.submit("world map", prepare_world_map, required=True)
+
+
+def prepare_world_map():
+    # Runs on an asset worker, so the import doesn't hold up the splash either
+    from world_map import prepare_chunks, MAP_PATH, CHUNK_DIR, WORLD_WIDTH, WORLD_HEIGHT
+
+    return prepare_chunks(MAP_PATH, CHUNK_DIR, WORLD_WIDTH, WORLD_HEIGHT)
 
-    # ensure alpha is reset
-    for alpha in range(0, 255, speed):
-        fade_surface.set_alpha(alpha)
-        screen.blit(fade_surface, (0, 0))
-        pygame.display.update()
-        pygame.time.delay(10)
 
+def draw_loading_bar(screen, progress):
+    """Thin progress bar along the bottom of the splash screen."""
+    screen_w, screen_h = screen.get_size()
+    bar = pygame.Rect(screen_w // 4, screen_h - 60, screen_w // 2, 12)
+    pygame.draw.rect(screen, (40, 40, 50), bar, border_radius=6)
+    fill = bar.copy()
+    fill.width = int(bar.width * progress)
+    if fill.width > 0:
+        pygame.draw.rect(screen, (230, 230, 230), fill, border_radius=6)
 
-def main():
+
+def main(first_frame=None):
+    """first_frame: called once the first menu frame is on screen (benchmarks.py startup)."""
     pygame.init()
     pygame.display.set_caption("Lasaire")
 
@@ -30,34 +65,80 @@ def main():
     screen_width, screen_height = get_screen_resolution()
     screen = pygame.display.set_mode((screen_width, screen_height))
     clock = pygame.time.Clock()
+    fade = Fade(screen, color=(0, 0, 0))
 
     # --- Splash Screen ---
+    # Shown while the asset workers load; we fade out as soon as they're done.
+    queue_startup_assets()
     try:
-        splash = pygame.image.load("../pngs/splash.png").convert()
+        splash = assets.image(SPLASH_PATH)
         splash = pygame.transform.scale(splash, (screen_width, screen_height))
-        screen.blit(splash, (0, 0))
-        pygame.display.flip()
-        pygame.time.wait(2000)  # show for 2 seconds
-        fade_out(screen, color=(0, 0, 0), speed=5)
     except Exception as e:
         print(f"Could not load splash image: {e}")
+        splash = None
+
+    splash_done = False
+
+    def end_splash():
+        nonlocal splash_done
+        splash_done = True
+
+    while not splash_done:
+        dt = clock.tick(60) / 1000.0
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                quit_game()
+
+        assets.poll()
+        if assets.ready() and not fade.active and not fade.covering:
+            if splash is not None:
+                fade.fade_out(SPLASH_FADE, on_done=end_splash)
+            else:
+                end_splash()
+        fade.update(dt)
+
+        if splash is not None:
+            screen.blit(splash, (0, 0))
+        else:
+            screen.fill((0, 0, 0))
+        draw_loading_bar(screen, assets.progress())
+        fade.draw(screen)
+        pygame.display.flip()
+
+    assets.poll()
+    if fade.covering:
+        fade.fade_in(MENU_FADE)
 
     # --- Menu UI setup ---
     background_color = (25, 25, 35)
     title_color = (255, 255, 255)
-    title_font = pygame.font.SysFont("georgia", 60)
+    title_font = get_font("georgia", 60)
 
     title_surface = title_font.render("LASAIRE", True, title_color)
     title_rect = title_surface.get_rect(center=(screen_width // 2, screen_height // 4))
 
+    # Set by the fade, picked up by the menu loop
+    game_requested = False
+    saved_game = None
+
+    def launch_game():
+        nonlocal game_requested
+        game_requested = True
+
     # Button callbacks
     def on_start():
-        fade_out(screen, color=(0, 0, 0), speed=8)
-        start_game(screen)      # from functions.py
-        # When start_game returns, we come back to this menu loop.
+        nonlocal saved_game
+        saved_game = None
+        fade.fade_out(MENU_FADE, on_done=launch_game)
 
     def on_load():
-        pass
+        nonlocal saved_game
+        from functions import load_game
+
+        saved_game = load_game()
+        if saved_game is not None:
+            fade.fade_out(MENU_FADE, on_done=launch_game)
 
     def on_quit():
         quit_game()
@@ -107,12 +188,29 @@ def main():
     # --- Main Menu Loop ---
     running = True
     while running:
+        dt = clock.tick(60) / 1000.0
+
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
 
-            for button in buttons:
-                button.handle_event(event)
+            # Buttons are ignored mid-fade so a double click can't start twice
+            if not fade.active:
+                for button in buttons:
+                    button.handle_event(event)
+
+        assets.poll()
+        fade.update(dt)
+
+        if game_requested:
+            game_requested = False
+            from functions import start_game
+
+            start_game(screen, saved_game)
+            saved_game = None
+            # When start_game returns, we come back to this menu loop.
+            fade.fade_in(MENU_FADE)
+            continue
 
         screen.fill(background_color)
         screen.blit(title_surface, title_rect)
@@ -120,8 +218,12 @@ def main():
         for button in buttons:
             button.draw(screen)
 
+        fade.draw(screen)
         pygame.display.flip()
-        clock.tick(60)
+
+        if first_frame is not None:
+            first_frame()
+            first_frame = None
 
     pygame.quit()
     sys.exit()
@@ -2,7 +2,8 @@
 
 import math
 import pygame
-from items import ItemStack, create_item, Item
+from items import Item
+from inventory import Inventory
 
 
 class Player:
@@ -12,7 +13,11 @@ class Player:
         self.y = float(y)
         self.speed = speed  # pixels per second
 
-        # Visuals
+        # Position before the last simulation step, for interpolated drawing
+        self.prev_x = self.x
+        self.prev_y = self.y
+
+        # Visuals (the sprite in sprites.build_world_atlas() is drawn from these)
         self.size = 35
         self.color = (255, 0, 0)
 
@@ -21,8 +26,7 @@ class Player:
         self.hp = self.max_hp
 
         # Inventory
-        self.inventory: list[ItemStack] = []
-        self.inventory_max_slots = 20  # change this if you want more/fewer slots
+        self.inventory = Inventory(max_slots=20)  # change this if you want more/fewer slots
 
         # Equipped items
         self.equipped_weapon: Item | None = None
@@ -53,6 +57,21 @@ class Player:
             self.x += dx * self.speed * dt
             self.y += dy * self.speed * dt
 
+    def store_previous_position(self):
+        """Call at the start of every simulation step."""
+        self.prev_x = self.x
+        self.prev_y = self.y
+
+    def interpolated_position(self, alpha):
+        """
+        Position between the previous and the current simulation step.
+        alpha=0 -> previous step, alpha=1 -> current step.
+        """
+        return (
+            self.prev_x + (self.x - self.prev_x) * alpha,
+            self.prev_y + (self.y - self.prev_y) * alpha,
+        )
+
     def clamp_to_world(self, world_width, world_height):
         """
         Keep player inside the world rectangle.
@@ -62,19 +81,27 @@ class Player:
         self.x = max(half, min(world_width - half, self.x))
         self.y = max(half, min(world_height - half, self.y))
 
-    def draw(self, screen, camera):
+    def draw(self, batch, camera, sprite, alpha=1.0):
         """
-        Draw the player using the camera to convert world->screen.
+        Queue the player's sprite into a sprites.SpriteBatch, centered on
+        the player, using the camera to convert world->screen.
+        alpha interpolates between the last two simulation steps.
         """
-        screen_x, screen_y = camera.world_to_screen(self.x, self.y)
-
-        rect = pygame.Rect(0, 0, self.size, self.size)
-        rect.center = (int(screen_x), int(screen_y))
-        pygame.draw.rect(screen, self.color, rect)
+        screen_x, screen_y = camera.world_to_screen(*self.interpolated_position(alpha))
+        width, height = sprite.size
+        batch.add(sprite, (int(screen_x) - width // 2, int(screen_y) - height // 2))
 
     # -----------------------------
     # Inventory helpers
     # -----------------------------
+    @property
+    def inventory_max_slots(self) -> int:
+        return self.inventory.max_slots
+
+    @inventory_max_slots.setter
+    def inventory_max_slots(self, value: int):
+        self.inventory.max_slots = value
+
     def add_item(self, item, amount: int = 1) -> bool:
         """
         Add an Item (or multiple) to the inventory.
@@ -85,64 +112,20 @@ class Player:
 
         Returns True if everything was added, False if there's not enough space.
         """
-
-        # If we got an item_id string instead of an Item instance, create it:
-        if isinstance(item, str):
-            item = create_item(item)
-
-        # If it's stackable, try to add to an existing stack first
-        if item.stackable:
-            for stack in self.inventory:
-                if stack.item.unique_id == item.unique_id and not stack.is_full():
-                    can_add = item.max_stack - stack.amount
-                    to_add = min(can_add, amount)
-                    stack.amount += to_add
-                    amount -= to_add
-                    if amount <= 0:
-                        return True  # everything added
-
-        # If there's still some amount left, we need new slots
-        while amount > 0:
-            if len(self.inventory) >= self.inventory_max_slots:
-                # No more slots
-                return False
-
-            to_add = min(amount, item.max_stack if item.stackable else 1)
-            self.inventory.append(ItemStack(item, to_add))
-            amount -= to_add
-
-        return True
+        return self.inventory.add(item, amount)
 
     def remove_item(self, item_id: str, amount: int = 1) -> bool:
         """
         Remove a certain amount of an item from the inventory.
         Returns True if successful, False if not enough items.
         """
-        for stack in list(self.inventory):  # copy so we can remove safely
-            if stack.item.id == item_id:
-                if stack.amount > amount:
-                    stack.amount -= amount
-                    return True
-                elif stack.amount == amount:
-                    self.inventory.remove(stack)
-                    return True
-                else:
-                    # Stack has less than we want: remove it and keep going
-                    amount -= stack.amount
-                    self.inventory.remove(stack)
-                    if amount <= 0:
-                        return True
-        return False
+        return self.inventory.remove(item_id, amount)
 
     def count_item(self, item_id: str) -> int:
         """
         How many of this item the player has in total.
         """
-        total = 0
-        for stack in self.inventory:
-            if stack.item.id == item_id:
-                total += stack.amount
-        return total
+        return self.inventory.count(item_id)
 
     def debug_print_inventory(self):
         """
@@ -174,7 +157,7 @@ class Player:
             print(f"Used {item.name}, but it has no heal effect (yet).")
 
         # Consume 1 from inventory
-        self.remove_item(item.id, 1)
+        self.remove_item(item.template_id, 1)
 
     def use_item(self, item: Item):
         """
@@ -0,0 +1,162 @@
+# profiler.py
+
+import csv
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import pygame
+
+from text_cache import get_font, render_text
+
+# Frames kept for the rolling percentiles (10 s at 60 fps)
+WINDOW = 600
+# Frames kept for dump_csv / dump_json (10 min at 60 fps)
+TRACE_LIMIT = 36000
+# Overlay text is refreshed every N frames, not every frame
+OVERLAY_REFRESH = 15
+
+OVERLAY_BG = (0, 0, 0, 170)
+OVERLAY_TEXT = (220, 255, 220)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class FrameProfiler:
+    """
+    Times named sections of every frame.
+
+        with profiler.section("grid"):
+            grid.draw(screen, camera)
+        ...
+        profiler.end_frame()
+
+    Keeps rolling p50/p95/p99 per section, can draw them as an overlay,
+    and can dump the per-frame trace as CSV or JSON.
+    """
+
+    def __init__(self, window=WINDOW, trace_limit=TRACE_LIMIT):
+        self.window = window
+        self.sections: list[str] = []            # in first-seen order
+        self._samples: dict[str, deque] = {}     # name -> last `window` ms values
+        self._current: dict[str, float] = {}     # ms spent in each section this frame
+        self.trace: deque = deque(maxlen=trace_limit)
+        self.frame = 0
+        self._frame_start = time.perf_counter()
+
+        self._overlay_lines: list[str] = []
+        self._overlay_rect: pygame.Rect | None = None
+        self._overlay_panel: pygame.Surface | None = None
+
+    @contextmanager
+    def section(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            ms = (time.perf_counter() - start) * 1000
+            self._current[name] = self._current.get(name, 0.0) + ms
+
+    def end_frame(self):
+        """Close the current frame and start timing the next one."""
+        now = time.perf_counter()
+        frame_ms = (now - self._frame_start) * 1000
+        self._frame_start = now
+
+        record = dict(self._current)
+        record["frame"] = frame_ms
+        for name, ms in record.items():
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+                if name != "frame":
+                    self.sections.append(name)
+            samples.append(ms)
+
+        record["index"] = self.frame
+        self.trace.append(record)
+        self._current = {}
+        self.frame += 1
+
+    def percentiles(self, name):
+        """(p50, p95, p99) in milliseconds for a section, or for "frame"."""
+        values = sorted(self._samples.get(name, ()))
+        return percentile(values, 50), percentile(values, 95), percentile(values, 99)
+
+    # ------------- overlay -------------
+
+    def _build_overlay_lines(self):
+        lines = [f"{'section':<10}{'p50':>7}{'p95':>7}{'p99':>7}  ms"]
+        for name in self.sections + ["frame"]:
+            p50, p95, p99 = self.percentiles(name)
+            lines.append(f"{name:<10}{p50:>7.2f}{p95:>7.2f}{p99:>7.2f}")
+        return lines
+
+    def draw(self, screen):
+        """
+        Draw the percentile table in the top-left corner.
+        Returns the screen rects that changed since the last draw.
+        """
+        refreshed = False
+        if self.frame % OVERLAY_REFRESH == 0 or not self._overlay_lines:
+            self._overlay_lines = self._build_overlay_lines()
+            refreshed = True
+
+        font = get_font("couriernew", 16)
+        line_h = font.get_linesize()
+        width = max(font.size(line)[0] for line in self._overlay_lines) + 16
+        height = line_h * len(self._overlay_lines) + 12
+        rect = pygame.Rect(10, 10, width, height)
+
+        if self._overlay_panel is None or self._overlay_panel.get_size() != rect.size:
+            self._overlay_panel = pygame.Surface(rect.size, pygame.SRCALPHA)
+            self._overlay_panel.fill(OVERLAY_BG)
+        screen.blit(self._overlay_panel, rect.topleft)
+
+        y = rect.y + 6
+        for line in self._overlay_lines:
+            screen.blit(render_text(font, line, OVERLAY_TEXT), (rect.x + 8, y))
+            y += line_h
+
+        last = self._overlay_rect
+        self._overlay_rect = rect
+        if not refreshed and rect == last:
+            return []
+        return [rect.union(last) if last else rect]
+
+    def hide(self, screen):
+        """Call on frames the overlay is off; returns the rect it used to cover."""
+        rect, self._overlay_rect = self._overlay_rect, None
+        return [rect] if rect else []
+
+    # ------------- trace dumps -------------
+
+    def _columns(self):
+        return ["index", "frame"] + self.sections
+
+    def dump_csv(self, path):
+        columns = self._columns()
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=columns, restval=0.0)
+            writer.writeheader()
+            for record in self.trace:
+                writer.writerow({c: record.get(c, 0.0) for c in columns})
+
+    def dump_json(self, path):
+        data = {
+            "sections": self.sections,
+            "percentiles": {
+                name: dict(zip(("p50", "p95", "p99"), self.percentiles(name)))
+                for name in self.sections + ["frame"]
+            },
+            "frames": list(self.trace),
+        }
+        with open(path, "w") as f:
+            json.dump(data, f)
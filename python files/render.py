@@ -0,0 +1,176 @@
+# render.py
+"""
+Render layers.
+
+A game frame is a stack of layers, drawn bottom to top:
+
+    map -> grid -> entities -> hud -> overlays -> fade -> profiler
+
+Each RenderLayer has a draw function (screen -> changed rects) and, if its
+picture only depends on a few things, a state function returning them
+(camera offset, hover state, ...). A layer is clean when it is not
+invalidated and its state is the same as when it was last drawn.
+
+The RenderGraph caches the lowest run of clean layers as one composite
+surface. While they stay clean (camera still, game paused behind a menu)
+every frame starts with a single blit of that composite instead of
+redrawing them, and only the layers above it are drawn live. A run is
+cached once it has been drawn twice with the same state, so layers that
+change every frame never pay for the copy.
+
+A Backdrop layer under the menus dims the world while one is open. Its
+state is only "on or off", so while the game is paused the dimmed world
+ends up in the composite: a freeze-frame that costs one blit per frame.
+"""
+
+import contextlib
+
+import pygame
+
+_NEVER = object()   # state of a layer that has not been drawn yet
+
+DIM_COLOR = (0, 0, 0, 120)   # what modal overlays put over the game
+
+
+class RenderLayer:
+    """
+    One step of the frame.
+
+        draw(screen) -> list of screen rects that changed
+        state() -> anything comparable; None (no state function) means the
+                   layer changes every frame and is never cached
+    """
+
+    def __init__(self, name, draw, state=None, section=None):
+        self.name = name
+        self.draw = draw
+        self.state = state
+        self.section = section   # profiler section to time draw() in, if any
+        self.drawn_state = _NEVER
+
+    @property
+    def cacheable(self):
+        return self.state is not None
+
+    def invalidate(self):
+        """Redraw this layer (and anything cached on top of it) next frame."""
+        self.drawn_state = _NEVER
+
+
+class RenderGraph:
+    """
+    Ordered layers plus the composite of the clean ones at the bottom.
+
+        graph = RenderGraph([RenderLayer("map", ...), ...])
+        dirty.add(graph.draw(screen, profiler))   # every frame
+        graph.invalidate()                       # e.g. after a settings change
+    """
+
+    def __init__(self, layers=()):
+        self.layers: list[RenderLayer] = list(layers)
+        self._composite = None   # screen-sized copy of layers[:_cached]
+        self._cached = 0
+        self.composite_frames = 0   # frames that started from the composite, for stats
+
+    def layer(self, name) -> RenderLayer:
+        return next(layer for layer in self.layers if layer.name == name)
+
+    def invalidate(self, name=None):
+        """Invalidate one layer by name, or every layer."""
+        layers = self.layers if name is None else [self.layer(name)]
+        for layer in layers:
+            layer.invalidate()
+
+    def _clean_run(self):
+        """How many layers, from the bottom, are clean."""
+        count = 0
+        for layer in self.layers:
+            if not layer.cacheable or layer.drawn_state is _NEVER or layer.state() != layer.drawn_state:
+                break
+            count += 1
+        return count
+
+    def draw(self, screen, profiler=None):
+        """Draw every layer (or the composite for the clean ones). Returns changed rects."""
+        clean = self._clean_run()
+        composite = self._composite
+        if composite is not None and (self._cached > clean or composite.get_size() != screen.get_size()):
+            self._cached = 0
+
+        start = 0
+        if self._cached:
+            # Nothing in the cached layers changed: same pixels, no dirty rects
+            with _section(profiler, "composite"):
+                screen.blit(composite, (0, 0))
+            start = self._cached
+            self.composite_frames += 1
+
+        rects = []
+        for index in range(start, len(self.layers)):
+            layer = self.layers[index]
+            with _section(profiler, layer.section):
+                changed = layer.draw(screen)
+            if changed:
+                rects += changed
+            if layer.cacheable:
+                layer.drawn_state = layer.state()
+
+            if index + 1 == clean and clean > self._cached:
+                # The bottom `clean` layers were drawn twice the same: keep them
+                if composite is None or composite.get_size() != screen.get_size():
+                    composite = self._composite = screen.copy()
+                else:
+                    composite.blit(screen, (0, 0))
+                self._cached = clean
+        return rects
+
+    def stats(self):
+        return {
+            "layers": len(self.layers),
+            "cached_layers": [layer.name for layer in self.layers[:self._cached]],
+            "composite_frames": self.composite_frames,
+        }
+
+
+class Backdrop:
+    """
+    Dims everything below it while is_on() says so (a menu is open).
+    The dim surface is made once per screen size and reused.
+
+    The menus drawn over it (inventory, settings) don't dim anything
+    themselves. Because the dim changes every pixel, they return the whole
+    screen as changed on the frame they open or close.
+
+        backdrop = Backdrop(lambda: menu.visible)
+        graph.layers.insert(i, backdrop.layer())
+    """
+
+    def __init__(self, is_on, color=DIM_COLOR):
+        self.is_on = is_on
+        self.color = color
+        self._surface: pygame.Surface | None = None
+        self._was_on = False
+
+    def state(self):
+        return bool(self.is_on())
+
+    def draw(self, screen):
+        """Returns the whole screen when the dim came on or went off."""
+        on = self.state()
+        changed = on != self._was_on
+        self._was_on = on
+        if on:
+            if self._surface is None or self._surface.get_size() != screen.get_size():
+                self._surface = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
+                self._surface.fill(self.color)
+            screen.blit(self._surface, (0, 0))
+        return [screen.get_rect()] if changed else []
+
+    def layer(self, name="backdrop", section=None):
+        return RenderLayer(name, self.draw, state=self.state, section=section)
+
+
+def _section(profiler, name):
+    if profiler is None or name is None:
+        return contextlib.nullcontext()
+    return profiler.section(name)
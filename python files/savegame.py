@@ -0,0 +1,427 @@
+# savegame.py
+"""
+Binary save files.
+
+    [ header | body ]
+
+The header is fixed size: magic, format version, flags, body length and a
+CRC32 of the (uncompressed) body. With FLAG_ZLIB set the body is zlib
+compressed. Everything is little-endian.
+
+The body stores the inventory column by column (template index, uid, amount)
+as packed arrays, so saving and loading a big inventory is a handful of
+array copies instead of one struct call per stack.
+
+Saving in game goes through SaveWriter: the main thread only copies what the
+save needs into a SaveSnapshot (it must see a consistent state). Encoding,
+compression and the atomic file write happen on a background thread.
+"""
+
+import json
+import os
+import struct
+import sys
+import zlib
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from operator import attrgetter
+from typing import NamedTuple
+
+from items import Item, ItemStack, TEMPLATES, get_uid_allocator
+from player import Player
+
+MAGIC = b"LSAV"
+SAVE_VERSION = 1
+
+FLAG_ZLIB = 1
+COMPRESS_LEVEL = 6
+
+# magic, version, flags, body length, body crc32
+HEADER = struct.Struct("<4sHHII")
+# x, y, speed, hp, max_hp, max_slots, uid width in bytes (8 or 16)
+PLAYER = struct.Struct("<dddiiIB")
+
+# Equipped weapon record
+EQUIPPED_NONE = 0
+EQUIPPED_STACK = 1    # the item of one of the saved stacks (index follows)
+EQUIPPED_ITEM = 2     # an item that is not in the inventory (item record follows)
+
+_U16 = "H"
+_U32 = "I" if array("I").itemsize == 4 else "L"
+_U64 = "Q"
+
+_U32_MAX = (1 << 32) - 1
+_U64_MASK = (1 << 64) - 1
+
+
+class SaveError(ValueError):
+    """The file is not a save we can read (wrong magic, newer version, corrupt)."""
+
+
+# -----------------------------
+# Encoding
+# -----------------------------
+def _le(arr):
+    """Array contents as little-endian bytes."""
+    if sys.byteorder == "big":
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _put_blob(out, data: bytes):
+    out += struct.pack("<I", len(data))
+    out += data
+
+
+def _put_json(out, value):
+    _put_blob(out, json.dumps(value, separators=(",", ":")).encode("utf-8"))
+
+
+def _put_uid(out, uid, width):
+    if width == 8:
+        out += struct.pack("<Q", uid)
+    else:
+        out += struct.pack("<QQ", uid & _U64_MASK, uid >> 64)
+
+
+_stack_item = attrgetter("item")
+_stack_amount = attrgetter("amount")
+
+
+def _check_uid(uid):
+    if not isinstance(uid, int) or uid < 0:
+        raise ValueError(f"Can only save non-negative integer item ids, got {uid!r}")
+    return uid
+
+
+class SaveSnapshot(NamedTuple):
+    """Copy of everything a save holds, safe to encode on another thread."""
+    x: float
+    y: float
+    speed: float
+    hp: int
+    max_hp: int
+    max_slots: int
+    settings: dict
+    items: list         # item of every stack; Items only change through their overrides
+    amounts: list       # amount of every stack
+    overrides: dict     # id(item) -> copy of item.overrides, for items that have them
+    equipped: Item | None
+
+
+def take_snapshot(player: Player, settings=None) -> SaveSnapshot:
+    """Copy the player's state for encode_snapshot(). No encoding happens here."""
+    # Two flat lists of existing objects: no per-stack allocations for the GC to chase
+    stacks = list(player.inventory)
+    items = list(map(_stack_item, stacks))
+    amounts = list(map(_stack_amount, stacks))
+    overrides = {id(item): dict(item.overrides) for item in items if item.overrides}
+    equipped = player.equipped_weapon
+    if equipped is not None and equipped.overrides:
+        overrides[id(equipped)] = dict(equipped.overrides)
+    return SaveSnapshot(
+        player.x, player.y, player.speed, player.hp, player.max_hp,
+        player.inventory.max_slots, dict(settings or {}), items, amounts, overrides, equipped,
+    )
+
+
+def encode_save(player: Player, settings=None) -> bytes:
+    """The uncompressed body for this player (and optional settings dict)."""
+    return encode_snapshot(take_snapshot(player, settings))
+
+
+def encode_snapshot(snapshot: SaveSnapshot) -> bytes:
+    """The uncompressed body for a SaveSnapshot."""
+    items = snapshot.items
+    uids = [_check_uid(item.unique_id) for item in items]
+    equipped = snapshot.equipped
+    if equipped is not None:
+        _check_uid(equipped.unique_id)
+    wide = any(uid > _U64_MASK for uid in uids) or (
+        equipped is not None and equipped.unique_id > _U64_MASK
+    )
+    uid_width = 16 if wide else 8
+
+    out = bytearray()
+    out += PLAYER.pack(
+        snapshot.x, snapshot.y, snapshot.speed, snapshot.hp, snapshot.max_hp,
+        min(snapshot.max_slots, _U32_MAX), uid_width,
+    )
+    _put_json(out, snapshot.settings)
+
+    # Template ids used by this save, stacks refer to them by index
+    template_ids = {}
+    for item in items:
+        template_ids.setdefault(item.template_id, len(template_ids))
+    if equipped is not None:
+        template_ids.setdefault(equipped.template_id, len(template_ids))
+    out += struct.pack("<H", len(template_ids))
+    for template_id in template_ids:
+        name = template_id.encode("utf-8")
+        out += struct.pack("<B", len(name))
+        out += name
+
+    # Stacks, one column at a time
+    out += struct.pack("<I", len(items))
+    out += _le(array(_U16, [template_ids[item.template_id] for item in items]))
+    out += _le(array(_U64, [uid & _U64_MASK for uid in uids]))
+    if uid_width == 16:
+        out += _le(array(_U64, [uid >> 64 for uid in uids]))
+    out += _le(array(_U32, snapshot.amounts))
+
+    # Per-item overrides are rare: (first stack index, json) for those that have them
+    item_overrides = snapshot.overrides
+    overrides = []
+    seen = set()
+    if item_overrides:
+        for index, item in enumerate(items):
+            values = item_overrides.get(id(item))
+            if values and id(item) not in seen:
+                seen.add(id(item))
+                overrides.append((index, values))
+    out += struct.pack("<I", len(overrides))
+    for index, values in overrides:
+        out += struct.pack("<I", index)
+        _put_json(out, values)
+
+    # Equipped weapon
+    if equipped is None:
+        out += struct.pack("<B", EQUIPPED_NONE)
+    else:
+        index = next((i for i, item in enumerate(items) if item is equipped), None)
+        if index is not None:
+            out += struct.pack("<BI", EQUIPPED_STACK, index)
+        else:
+            out += struct.pack("<BH", EQUIPPED_ITEM, template_ids[equipped.template_id])
+            _put_uid(out, equipped.unique_id, uid_width)
+            _put_json(out, item_overrides.get(id(equipped), {}))
+
+    return bytes(out)
+
+
+def pack_save(body: bytes, compress=False) -> bytes:
+    """Header + (optionally compressed) body, ready to write to disk."""
+    flags = 0
+    payload = body
+    if compress:
+        flags |= FLAG_ZLIB
+        payload = zlib.compress(body, COMPRESS_LEVEL)
+    return HEADER.pack(MAGIC, SAVE_VERSION, flags, len(body), zlib.crc32(body)) + payload
+
+
+# -----------------------------
+# Decoding
+# -----------------------------
+class _Reader:
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.pos = 0
+
+    def take(self, size):
+        end = self.pos + size
+        if end > len(self.data):
+            raise SaveError("Save file is truncated")
+        chunk = self.data[self.pos:end]
+        self.pos = end
+        return chunk
+
+    def unpack(self, fmt):
+        return struct.unpack(fmt, self.take(struct.calcsize(fmt)))
+
+    def array(self, typecode, count):
+        arr = array(typecode)
+        arr.frombytes(self.take(arr.itemsize * count))
+        if sys.byteorder == "big":
+            arr.byteswap()
+        return arr
+
+    def uid(self, width):
+        if width == 8:
+            return self.unpack("<Q")[0]
+        lo, hi = self.unpack("<QQ")
+        return lo | hi << 64
+
+    def json(self):
+        (size,) = self.unpack("<I")
+        return json.loads(bytes(self.take(size)).decode("utf-8"))
+
+
+def unpack_save(data: bytes) -> bytes:
+    """Check the header and return the uncompressed body."""
+    if len(data) < HEADER.size:
+        raise SaveError("Save file is truncated")
+    magic, version, flags, body_len, crc = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SaveError("Not a Lasaire save file")
+    if version > SAVE_VERSION:
+        raise SaveError(f"Save format {version} is newer than this game ({SAVE_VERSION})")
+
+    body = data[HEADER.size:]
+    if flags & FLAG_ZLIB:
+        try:
+            body = zlib.decompress(body)
+        except zlib.error as e:
+            raise SaveError(f"Save file is corrupt: {e}") from e
+    if len(body) != body_len or zlib.crc32(body) != crc:
+        raise SaveError("Save file is corrupt (checksum mismatch)")
+    return body
+
+
+def decode_save(body: bytes, observe=True):
+    """
+    Rebuild (player, settings) from an uncompressed body.
+    observe=False leaves the uid allocator alone (for off-thread compaction).
+    """
+    reader = _Reader(body)
+    x, y, speed, hp, max_hp, max_slots, uid_width = reader.unpack(PLAYER.format)
+    if uid_width not in (8, 16):
+        raise SaveError(f"Bad uid width {uid_width}")
+    settings = reader.json()
+
+    (template_count,) = reader.unpack("<H")
+    templates = []
+    for _ in range(template_count):
+        (size,) = reader.unpack("<B")
+        template_id = bytes(reader.take(size)).decode("utf-8")
+        template = TEMPLATES.get(template_id)
+        if template is None:
+            raise SaveError(f"Save uses an unknown item: {template_id}")
+        templates.append(template)
+
+    (count,) = reader.unpack("<I")
+    template_idx = reader.array(_U16, count)
+    uids = reader.array(_U64, count)
+    if uid_width == 16:
+        uids = [lo | hi << 64 for lo, hi in zip(uids, reader.array(_U64, count))]
+    amounts = reader.array(_U32, count)
+
+    (override_count,) = reader.unpack("<I")
+    overrides = {}
+    for _ in range(override_count):
+        (index,) = reader.unpack("<I")
+        overrides[index] = reader.json()
+
+    # Stacks split from one item share the Item, like they did in game
+    items = {}
+    stacks = []
+    for index, (uid, template, amount) in enumerate(zip(uids, template_idx, amounts)):
+        item = items.get(uid)
+        if item is None:
+            item = items[uid] = Item(templates[template], uid, **overrides.get(index, {}))
+        stacks.append(ItemStack(item, amount))
+    if observe:
+        get_uid_allocator().observe_many(items)
+
+    (kind,) = reader.unpack("<B")
+    equipped = None
+    if kind == EQUIPPED_STACK:
+        (index,) = reader.unpack("<I")
+        equipped = stacks[index].item
+    elif kind == EQUIPPED_ITEM:
+        (index,) = reader.unpack("<H")
+        uid = reader.uid(uid_width)
+        equipped = Item(templates[index], uid, **reader.json())
+        if observe:
+            get_uid_allocator().observe(uid)
+    elif kind != EQUIPPED_NONE:
+        raise SaveError(f"Bad equipped weapon record {kind}")
+
+    player = Player(x, y, speed=speed)
+    player.max_hp = max_hp
+    player.hp = hp
+    player.inventory.max_slots = max_slots
+    player.inventory.restore(stacks)
+    player.equipped_weapon = equipped
+    return player, settings
+
+
+# -----------------------------
+# Files
+# -----------------------------
+def write_atomic(path, data: bytes):
+    """Write to a temp file next to path, then rename over it."""
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def save_game(path, player, settings=None, compress=False):
+    """Save synchronously. SaveWriter.save() does the same off the main thread."""
+    write_atomic(path, pack_save(encode_save(player, settings), compress))
+
+
+def read_save(path) -> bytes:
+    """Uncompressed, checked body of a save file."""
+    with open(path, "rb") as f:
+        data = f.read()
+    return unpack_save(data)
+
+
+def load_save(path):
+    """(player, settings) from a save file. Raises SaveError for bad files."""
+    return decode_save(read_save(path))
+
+
+class SaveWriter:
+    """
+    Writes saves on one background thread, in the order they were requested.
+
+        saver.save(path, player, settings, compress=True)   # returns a Future
+
+    Only the snapshot is taken on the calling thread. A job that fails is
+    reported when it fails, and wait() raises it again as a SaveError.
+    """
+
+    def __init__(self):
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="save")
+        self._pending = []
+
+    def save(self, path, player, settings=None, compress=False):
+        snapshot = take_snapshot(player, settings)
+        return self.submit(self._write, path, snapshot, compress)
+
+    def submit(self, fn, *args):
+        """Run any other save-file job (e.g. journal writes) on the same thread, in order."""
+        future = self._pool.submit(fn, *args)
+        future.add_done_callback(self._report)
+        # Failed jobs stay pending until wait() has raised their error
+        self._pending = [f for f in self._pending if not f.done() or f.exception() is not None] + [future]
+        return future
+
+    def _report(self, future):
+        # Runs on the save thread, as soon as the job ends
+        if future.cancelled() or future.exception() is None:
+            return
+        print(f"Saving failed: {future.exception()}")
+
+    @staticmethod
+    def _write(path, snapshot, compress):
+        write_atomic(path, pack_save(encode_snapshot(snapshot), compress))
+        return path
+
+    def busy(self) -> bool:
+        return any(not f.done() for f in self._pending)
+
+    def wait(self):
+        """Block until every queued save is on disk. Raises SaveError if a job failed."""
+        pending, self._pending = self._pending, []
+        for future in pending:
+            try:
+                future.result()
+            except SaveError:
+                raise
+            except Exception as e:
+                raise SaveError(f"Saving failed: {e}") from e
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+
+saver = SaveWriter()
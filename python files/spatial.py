@@ -0,0 +1,163 @@
+# spatial.py
+"""
+Uniform-grid spatial index for array-backed entities.
+
+The world is cut into square cells the size of a map tile. SpatialGrid keeps
+the rows of an entity store sorted by the cell their center is in, so every
+horizontal run of cells is one contiguous slice. Asking "what is on screen"
+or "what is near the player" is then a couple of binary searches and one
+slice per row of cells, instead of a test against every entity in the
+4000x4000 world.
+
+Moving is incremental: update() recomputes the cell keys in the current
+order (one vectorized pass), takes out only the rows whose cell changed and
+merges them back in at their new place. Between two ticks few rows change
+cell, so that is a small sort plus one linear merge, never a full re-sort.
+
+Queries are a broad phase: they return everything in the touched cells,
+which may include entities just outside the rect / circle. Callers that need
+an exact answer check the few candidates themselves (EntityStore does).
+"""
+
+import numpy as np
+
+from grid import TILE_SIZE
+
+# Cell key = cy * CELL_STRIDE + cx, so keys sort row by row, left to right.
+# Cells are clamped into [0, CELL_STRIDE) per axis; anything outside the world
+# piles up in the edge cells, which is still a correct broad phase.
+# (Clamping first also makes truncating to int the same as floor.)
+CELL_STRIDE = 1 << 20
+
+
+class SpatialGrid:
+    """
+    Rows sorted by cell:  keys[i] is the cell of row order[i], keys ascending.
+
+        grid = SpatialGrid()
+        grid.add(rows, x, y)                   # new rows
+        grid.update(x, y)                      # after moving (x, y: every live row)
+        rows = grid.query_rect(left, top, w, h)
+        rows = grid.query_radius(x, y, radius)
+    """
+
+    def __init__(self, cell_size=TILE_SIZE):
+        self.cell_size = cell_size
+        self._keys = np.zeros(0, dtype=np.int64)
+        self._order = np.zeros(0, dtype=np.intp)
+        self.moves = 0   # rows re-filed by update(), for stats
+
+    def __len__(self):
+        return len(self._order)
+
+    # ------------- cells -------------
+
+    def _cell(self, value) -> int:
+        return min(int(max(value, 0.0) / self.cell_size), CELL_STRIDE - 1)
+
+    def _cells(self, values):
+        cells = (np.maximum(values, 0.0) / self.cell_size).astype(np.int64)
+        return np.minimum(cells, CELL_STRIDE - 1, out=cells)
+
+    def keys_for(self, x, y):
+        """Cell keys of positions (arrays)."""
+        keys = self._cells(y)
+        keys *= CELL_STRIDE
+        keys += self._cells(x)
+        return keys
+
+    def _insert(self, keys, rows):
+        """Merge (keys, rows) into the sorted arrays."""
+        by_key = np.argsort(keys, kind="stable")
+        keys = keys[by_key]
+        at = np.searchsorted(self._keys, keys, side="right")
+        self._keys = np.insert(self._keys, at, keys)
+        self._order = np.insert(self._order, at, rows[by_key])
+
+    # ------------- updates -------------
+
+    def add(self, rows, x, y):
+        """File new rows at positions x, y (arrays of the same length)."""
+        self._insert(self.keys_for(x, y), np.asarray(rows, dtype=np.intp))
+
+    def update(self, x, y):
+        """
+        Re-file the rows whose cell changed. x, y are the position arrays of
+        every live row (indexed by row). Returns how many rows moved cell.
+        """
+        order = self._order
+        keys = self.keys_for(x[order], y[order])
+        changed = keys != self._keys
+        moved = int(np.count_nonzero(changed))
+        if moved:
+            # The rows that stayed are still sorted: merge the few movers back
+            # in. Each mover lands after the stayers with keys <= its own.
+            stay = ~changed
+            stay_keys = keys[stay]
+            moved_keys = keys[changed]
+            by_key = np.argsort(moved_keys, kind="stable")
+            moved_keys = moved_keys[by_key]
+            at = np.searchsorted(stay_keys, moved_keys, side="right")
+            at += np.arange(moved)
+            landed = np.zeros(len(keys), dtype=bool)
+            landed[at] = True
+            kept = ~landed
+
+            self._keys = np.empty_like(keys)
+            self._keys[at] = moved_keys
+            self._keys[kept] = stay_keys
+            self._order = np.empty_like(order)
+            self._order[at] = order[changed][by_key]
+            self._order[kept] = order[stay]
+            self.moves += moved
+        return moved
+
+    def remove_row(self, row, renumber_from=None):
+        """
+        Drop row from the index. If the store then moved its row renumber_from
+        into the hole (swap-remove), pass it so the index follows.
+        """
+        at = np.flatnonzero(self._order == row)
+        self._keys = np.delete(self._keys, at)
+        self._order = np.delete(self._order, at)
+        if renumber_from is not None and renumber_from != row:
+            self._order[self._order == renumber_from] = row
+
+    def clear(self):
+        self._keys = np.zeros(0, dtype=np.int64)
+        self._order = np.zeros(0, dtype=np.intp)
+
+    # ------------- queries -------------
+
+    def query_cells(self, x0, y0, x1, y1):
+        """Rows in cells x0..x1, y0..y1 (inclusive), as an array."""
+        if x1 < x0 or y1 < y0:
+            return self._order[:0]
+        row_keys = np.arange(y0, y1 + 1, dtype=np.int64) * CELL_STRIDE
+        starts = np.searchsorted(self._keys, row_keys + x0, side="left").tolist()
+        ends = np.searchsorted(self._keys, row_keys + x1, side="right").tolist()
+        order = self._order
+        slices = [order[start:end] for start, end in zip(starts, ends) if end > start]
+        if not slices:
+            return order[:0]
+        return slices[0] if len(slices) == 1 else np.concatenate(slices)
+
+    def query_rect(self, left, top, width, height):
+        """Rows in the cells the rect touches."""
+        return self.query_cells(
+            self._cell(left), self._cell(top),
+            self._cell(left + width), self._cell(top + height),
+        )
+
+    def query_radius(self, x, y, radius):
+        """Rows in the cells the circle's bounding box touches."""
+        return self.query_rect(x - radius, y - radius, radius * 2, radius * 2)
+
+    def stats(self):
+        cells, counts = np.unique(self._keys, return_counts=True)
+        return {
+            "rows": len(self._order),
+            "cells": len(cells),
+            "max_per_cell": int(counts.max(initial=0)),
+            "moves": self.moves,
+        }
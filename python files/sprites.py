@@ -0,0 +1,238 @@
+# sprites.py
+"""
+Texture atlas and sprite batching for the world.
+
+At load time every sprite (player, mobs, item icons) is packed into one or
+more big atlas pages. Drawing a layer is then: queue (sprite, position) for
+everything on screen into a SpriteBatch, and submit the whole batch with one
+Surface.blits() call, sorted by atlas page. Thousands of sprites cost one
+call into pygame instead of one draw call each.
+
+The same batch can also be drawn through pygame's SDL2 renderer
+(pygame._sdl2.video), with each atlas page uploaded once as a texture:
+
+    textures = atlas.to_textures(renderer)
+    batch.draw_gpu(renderer, textures)
+
+There is no sprite art yet, so build_world_atlas() draws simple sprites
+(squares for mobs, one icon per item category) into the atlas.
+"""
+
+from operator import itemgetter
+from typing import NamedTuple
+
+import pygame
+
+ATLAS_PAGE_SIZE = 1024
+ATLAS_PADDING = 1      # empty pixels around every sprite, so GPU filtering never bleeds
+
+ICON_SIZE = 24
+
+# Item icon colors per category
+CATEGORY_COLORS = {
+    "weapon": (190, 190, 210),
+    "consumable": (220, 60, 80),
+    "material": (90, 200, 110),
+    "other": (200, 170, 80),
+}
+
+_page_key = itemgetter(0)
+
+
+class Sprite(NamedTuple):
+    page: int                 # atlas page index
+    surface: pygame.Surface   # that page
+    area: pygame.Rect         # where the sprite is on the page
+
+    @property
+    def size(self):
+        return self.area.size
+
+
+class SpriteAtlas:
+    """
+    Sprites packed into as few ATLAS_PAGE_SIZE pages as they fit in.
+
+        atlas = SpriteAtlas()
+        atlas.add("player", surface)
+        ...
+        atlas.build()                  # packs; call once, after adding everything
+        sprite = atlas["player"]
+    """
+
+    def __init__(self, page_size=ATLAS_PAGE_SIZE, padding=ATLAS_PADDING):
+        self.page_size = page_size
+        self.padding = padding
+        self._sources: dict[object, pygame.Surface] = {}
+        self._sprites: dict[object, Sprite] = {}
+        self.pages: list[pygame.Surface] = []
+
+    def add(self, key, surface):
+        if self.pages:
+            raise RuntimeError("SpriteAtlas.add() after build()")
+        w, h = surface.get_size()
+        if max(w, h) + 2 * self.padding > self.page_size:
+            raise ValueError(f"Sprite {key!r} ({w}x{h}) does not fit an atlas page")
+        self._sources[key] = surface
+
+    def build(self):
+        """
+        Shelf-pack every sprite, tallest first: fill a row left to right,
+        start a new row under it, start a new page when the page is full.
+        """
+        pad = self.padding
+        size = self.page_size
+        placements = []   # (key, page, x, y)
+        page = x = y = shelf_h = 0
+        by_height = sorted(self._sources.items(), key=lambda kv: kv[1].get_height(), reverse=True)
+        for key, surface in by_height:
+            w, h = surface.get_width() + 2 * pad, surface.get_height() + 2 * pad
+            if x + w > size:
+                x, y, shelf_h = 0, y + shelf_h, 0
+            if y + h > size:
+                page, x, y, shelf_h = page + 1, 0, 0, 0
+            placements.append((key, page, x, y))
+            x += w
+            shelf_h = max(shelf_h, h)
+
+        page_count = page + 1 if placements else 0
+        pages = [pygame.Surface((size, size), pygame.SRCALPHA) for _ in range(page_count)]
+        for key, page, x, y in placements:
+            pages[page].blit(self._sources[key], (x + pad, y + pad))
+
+        # Same pixel format as the display, so blits don't convert every frame
+        if pygame.display.get_surface() is not None:
+            pages = [page.convert_alpha() for page in pages]
+        self.pages = pages
+
+        for key, page, x, y in placements:
+            area = pygame.Rect((x + pad, y + pad), self._sources[key].get_size())
+            self._sprites[key] = Sprite(page, pages[page], area)
+        self._sources.clear()
+        return self
+
+    def __getitem__(self, key) -> Sprite:
+        return self._sprites[key]
+
+    def get(self, key, default=None):
+        return self._sprites.get(key, default)
+
+    def __contains__(self, key):
+        return key in self._sprites
+
+    def __len__(self):
+        return len(self._sprites)
+
+    def to_textures(self, renderer):
+        """Upload every page as a pygame._sdl2.video.Texture, for SpriteBatch.draw_gpu()."""
+        from pygame._sdl2.video import Texture
+
+        return [Texture.from_surface(renderer, page) for page in self.pages]
+
+
+class SpriteBatch:
+    """
+    One layer's sprites for one frame.
+
+        batch.add(sprite, (x, y))        # top-left on screen
+        ...
+        dirty += batch.draw(screen)      # one blits() call; returns changed rects
+
+    Sprites are drawn grouped by atlas page. Within a page they keep the
+    order they were added in, so add back to front.
+    """
+
+    def __init__(self):
+        self._items: list[tuple] = []    # (page, surface, dest, area)
+        self._last_rects: list[pygame.Rect] = []
+
+    def __len__(self):
+        return len(self._items)
+
+    def add(self, sprite: Sprite, dest):
+        self._items.append((sprite.page, sprite.surface, dest, sprite.area))
+
+    def add_many(self, sprites, indices, left, top):
+        """Queue sprites[indices[i]] at (left[i], top[i]) for every i (sequences or int arrays)."""
+        append = self._items.append
+        for index, x, y in zip(_as_list(indices), _as_list(left), _as_list(top)):
+            sprite = sprites[index]
+            append((sprite.page, sprite.surface, (x, y), sprite.area))
+
+    def clear(self):
+        self._items.clear()
+
+    def _sorted(self):
+        # Stable, so back-to-front order is kept per page; already sorted
+        # (one page, the usual case) is a single pass
+        self._items.sort(key=_page_key)
+        return self._items
+
+    def draw(self, surface):
+        """
+        Blit everything queued onto surface and empty the batch.
+        Returns the rects that changed: where sprites were last time and where they are now.
+        """
+        items = self._sorted()
+        rects = surface.blits([(src, dest, area) for _page, src, dest, area in items])
+        items.clear()
+        dirty = self._last_rects + rects
+        self._last_rects = rects
+        return dirty
+
+    def draw_gpu(self, renderer, textures):
+        """Draw everything queued with an SDL2 renderer (textures from SpriteAtlas.to_textures())."""
+        for page, _src, (x, y), area in self._sorted():
+            textures[page].draw(srcrect=area, dstrect=(x, y, area.width, area.height))
+        self._items.clear()
+
+
+def _as_list(values):
+    return values.tolist() if hasattr(values, "tolist") else values
+
+
+# -----------------------------
+# Built-in sprites
+# -----------------------------
+def square_sprite(size, color):
+    """A filled square with a darker edge: what the player and mobs look like for now."""
+    surface = pygame.Surface((size, size), pygame.SRCALPHA)
+    surface.fill(color)
+    edge = tuple(c // 2 for c in color)
+    pygame.draw.rect(surface, edge, surface.get_rect(), max(1, size // 12))
+    return surface
+
+
+def item_icon(category, size=ICON_SIZE):
+    """A small generated icon for an item category."""
+    color = CATEGORY_COLORS.get(category, CATEGORY_COLORS["other"])
+    surface = pygame.Surface((size, size), pygame.SRCALPHA)
+    s = size
+    if category == "weapon":
+        pygame.draw.line(surface, color, (s * 0.2, s * 0.8), (s * 0.85, s * 0.15), max(2, s // 6))
+        pygame.draw.line(surface, (120, 80, 40), (s * 0.1, s * 0.6), (s * 0.4, s * 0.9), max(2, s // 8))
+    elif category == "consumable":
+        pygame.draw.circle(surface, color, (s // 2, s * 0.62), s * 0.34)
+        pygame.draw.rect(surface, (200, 200, 220), (s * 0.4, s * 0.08, s * 0.2, s * 0.25))
+    elif category == "material":
+        pygame.draw.ellipse(surface, color, (s * 0.1, s * 0.3, s * 0.8, s * 0.6))
+    else:
+        pygame.draw.rect(surface, color, (s * 0.15, s * 0.15, s * 0.7, s * 0.7), border_radius=s // 6)
+    return surface
+
+
+def build_world_atlas(player_size, player_color):
+    """
+    Atlas with everything the world and the inventory draw:
+      "player", ("slime", i) for each SLIME_COLORS entry, ("icon", category).
+    Call after the display exists so the pages get its pixel format.
+    """
+    from entities import SLIME_COLORS, SLIME_SIZE
+
+    atlas = SpriteAtlas()
+    atlas.add("player", square_sprite(player_size, player_color))
+    for index, color in enumerate(SLIME_COLORS):
+        atlas.add(("slime", index), square_sprite(SLIME_SIZE, color))
+    for category in CATEGORY_COLORS:
+        atlas.add(("icon", category), item_icon(category))
+    return atlas.build()
@@ -0,0 +1,111 @@
+# text_cache.py
+
+import threading
+from collections import OrderedDict
+
+import pygame
+
+# Upper bound for the pixel memory held by cached text surfaces.
+# 8 MB is a few thousand short labels, more than any menu we have.
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+
+
+# -----------------------------
+# Font registry
+# -----------------------------
+_fonts = {}
+
+# SDL_ttf shares one FreeType library between all fonts and must not be used
+# from several threads at once. Fonts are opened under this lock, so asset
+# workers open them one at a time (other jobs still run in parallel).
+FONT_LOCK = threading.Lock()
+
+
+def get_font(name, size):
+    """
+    Return a shared pygame Font for (name, size).
+
+    pygame.font.SysFont has to search the system font list every time,
+    so every UI module should get its fonts from here instead.
+    name=None means pygame's default font. Safe to call from asset workers.
+    """
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        with FONT_LOCK:
+            # Another thread may have opened it while we waited
+            font = _fonts.get(key)
+            if font is None:
+                font = pygame.font.SysFont(name, size)
+                _fonts[key] = font
+    return font
+
+
+# -----------------------------
+# Rendered text cache
+# -----------------------------
+class TextCache:
+    """
+    LRU cache of rendered text surfaces, keyed by (font, text, color, antialias).
+
+    Memory is bounded by the total pixel size of the cached surfaces,
+    not by the number of entries, so one huge label can't push us over.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+
+    def render(self, font, text, color, antialias=True):
+        """Same as font.render(text, antialias, color), but cached."""
+        key = (font, text, tuple(color), antialias)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        size = surface.get_bytesize() * surface.get_width() * surface.get_height()
+
+        # Anything bigger than the whole budget is returned but not kept
+        if size > self.max_bytes:
+            return surface
+
+        self._entries[key] = (surface, size)
+        self.used_bytes += size
+        self._evict()
+        return surface
+
+    def _evict(self):
+        while self.used_bytes > self.max_bytes and self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self.used_bytes -= size
+
+    def clear(self):
+        self._entries.clear()
+        self.used_bytes = 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "used_bytes": self.used_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+# Shared cache used by all UI modules
+text_cache = TextCache()
+
+
+def render_text(font, text, color, antialias=True):
+    """Render text through the shared cache."""
+    return text_cache.render(font, text, color, antialias)
@@ -0,0 +1,91 @@
+# transitions.py
+
+import pygame
+
+# Longest step a single update() may advance, so a long stall
+# (e.g. coming back from the game loop) doesn't skip the whole fade.
+MAX_STEP = 1 / 30
+
+
+class Fade:
+    """
+    Full-screen fade to/from a solid color, advanced by dt inside a frame loop.
+
+    The overlay surface is allocated once; each frame only its alpha changes.
+    Nothing here blocks, so input, asset polling and world setup keep going
+    while the fade plays.
+    """
+
+    def __init__(self, screen, color=(0, 0, 0)):
+        self.screen = screen
+        self.color = color
+        self.overlay = pygame.Surface(screen.get_size())
+        self.overlay.fill(color)
+
+        self.alpha = 0.0        # 0 = invisible, 255 = solid color
+        self.target = 0.0
+        self.speed = 0.0        # alpha units per second
+        self.on_done = None
+        self._was_drawn = False
+
+    @property
+    def active(self) -> bool:
+        return self.alpha != self.target
+
+    @property
+    def covering(self) -> bool:
+        """True while any part of the overlay is visible."""
+        return self.alpha > 0
+
+    def _start(self, target, duration, on_done):
+        self.target = target
+        self.speed = 255 / duration if duration > 0 else float("inf")
+        self.on_done = on_done
+
+    def fade_out(self, duration=0.4, on_done=None, from_clear=True):
+        """Fade to the solid color. on_done() runs once it's fully covered."""
+        if from_clear:
+            self.alpha = 0.0
+        self._start(255.0, duration, on_done)
+
+    def fade_in(self, duration=0.4, on_done=None, from_solid=True):
+        """Fade from the solid color back to the scene."""
+        if from_solid:
+            self.alpha = 255.0
+        self._start(0.0, duration, on_done)
+
+    def update(self, dt):
+        if not self.active:
+            return
+        step = self.speed * min(dt, MAX_STEP)
+        if self.alpha < self.target:
+            self.alpha = min(self.target, self.alpha + step)
+        else:
+            self.alpha = max(self.target, self.alpha - step)
+
+        if not self.active and self.on_done is not None:
+            callback = self.on_done
+            self.on_done = None
+            callback()
+
+    def draw(self, screen=None):
+        """
+        Blit the overlay on top of everything else.
+        Returns the screen rects that changed since the last draw.
+        """
+        screen = screen or self.screen
+        if self.alpha <= 0:
+            if self._was_drawn:
+                # The overlay just went away
+                self._was_drawn = False
+                return [screen.get_rect()]
+            return []
+
+        if self.overlay.get_size() != screen.get_size():
+            self.overlay = pygame.Surface(screen.get_size())
+            self.overlay.fill(self.color)
+
+        self.overlay.set_alpha(int(self.alpha))
+        screen.blit(self.overlay, (0, 0))
+        self._was_drawn = True
+        return [screen.get_rect()]
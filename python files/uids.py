@@ -0,0 +1,67 @@
+# uids.py
+
+import itertools
+import secrets
+
+# 64-bit ids: [ 24-bit session prefix | 40-bit counter ]
+PREFIX_BITS = 24
+COUNTER_BITS = 40
+COUNTER_MASK = (1 << COUNTER_BITS) - 1
+MAX_PREFIX = (1 << PREFIX_BITS) - 1
+
+
+class UidAllocator:
+    """
+    Hands out unique item ids. Subclasses decide what an id looks like;
+    items.generate_uid() goes through whichever allocator is installed.
+    Ids are non-negative ints; save files store them as they are.
+    """
+
+    def allocate(self):
+        raise NotImplementedError
+
+    def observe(self, uid):
+        """Tell the allocator about an id that already exists (e.g. loaded from a save)."""
+
+    def observe_many(self, uids):
+        for uid in uids:
+            self.observe(uid)
+
+
+class CounterAllocator(UidAllocator):
+    """
+    Fast monotonic 64-bit ids: a per-session prefix plus a counter.
+
+    Ids from one allocator are increasing, so they sort in creation order.
+    Two allocators never collide as long as their prefixes differ. Without a
+    prefix a random one is used, which only makes a clash unlikely: processes
+    whose items get merged later must each install
+    CounterAllocator(prefix=...) with their own number (items.set_uid_allocator).
+    """
+
+    def __init__(self, prefix=None, start=1):
+        if prefix is None:
+            prefix = secrets.randbelow(MAX_PREFIX) + 1   # never 0
+        if not 0 <= prefix <= MAX_PREFIX:
+            raise ValueError(f"prefix must be 0..{MAX_PREFIX}, got {prefix}")
+        self.prefix = prefix
+        self._base = prefix << COUNTER_BITS
+        self._counter = itertools.count(start)
+
+    def allocate(self) -> int:
+        n = next(self._counter)
+        if n > COUNTER_MASK:
+            raise OverflowError("uid counter exhausted for this session prefix")
+        return self._base | n
+
+    def observe(self, uid):
+        """Skip past ids with our own prefix, so loaded items are never reused."""
+        if isinstance(uid, int) and uid >> COUNTER_BITS == self.prefix:
+            n = (uid & COUNTER_MASK) + 1
+            current = next(self._counter)
+            self._counter = itertools.count(max(n, current))
+
+    def observe_many(self, uids):
+        own = [uid for uid in uids if isinstance(uid, int) and uid >> COUNTER_BITS == self.prefix]
+        if own:
+            self.observe(max(own))
@@ -0,0 +1,249 @@
+# world_map.py
+
+import json
+import os
+from collections import OrderedDict
+
+import pygame
+
+# Size of the world in world pixels (the map image is stretched to it)
+WORLD_WIDTH = 4000
+WORLD_HEIGHT = 4000
+
+MAP_PATH = "../pngs/map.jpg"
+CHUNK_DIR = "../pngs/map_chunks"   # generated, not in git
+
+CHUNK_SIZE = 512                   # world pixels per chunk side
+PREFETCH_MARGIN = 256              # extra world pixels around the viewport to load ahead
+MEMORY_BUDGET = 64 * 1024 * 1024   # bytes of chunk surfaces kept in memory
+PREFETCH_PER_FRAME = 2             # max off-screen chunks loaded per frame
+
+MANIFEST_NAME = "manifest.json"
+
+
+def _chunk_path(chunk_dir, cx, cy):
+    return os.path.join(chunk_dir, f"{cx}_{cy}.png")
+
+
+def split_map(source_path, chunk_dir, world_width, world_height, chunk_size=CHUNK_SIZE):
+    """
+    Cut a map image into chunk_size x chunk_size files covering the whole world.
+
+    The image is stretched to the world size one chunk at a time, so no
+    world-sized surface is ever made. The source image itself is decoded
+    whole (pygame can't read part of a JPEG), so it has to fit in memory
+    once, here. Cutting it in strips wouldn't help without a decoder that
+    can stop partway; a source bigger than that has to come pre-tiled.
+    Only needs to run again when the source image changes.
+    """
+    image = pygame.image.load(source_path)
+    img_w, img_h = image.get_size()
+    scale_x = img_w / world_width
+    scale_y = img_h / world_height
+
+    os.makedirs(chunk_dir, exist_ok=True)
+
+    cols = (world_width + chunk_size - 1) // chunk_size
+    rows = (world_height + chunk_size - 1) // chunk_size
+    for cy in range(rows):
+        for cx in range(cols):
+            # Chunk rectangle in world pixels (edge chunks can be smaller)
+            wx = cx * chunk_size
+            wy = cy * chunk_size
+            ww = min(chunk_size, world_width - wx)
+            wh = min(chunk_size, world_height - wy)
+
+            # Matching rectangle in source pixels
+            sx = int(wx * scale_x)
+            sy = int(wy * scale_y)
+            sw = max(1, min(img_w, round((wx + ww) * scale_x)) - sx)
+            sh = max(1, min(img_h, round((wy + wh) * scale_y)) - sy)
+
+            piece = image.subsurface((sx, sy, sw, sh))
+            piece = pygame.transform.smoothscale(piece, (ww, wh))
+            pygame.image.save(piece, _chunk_path(chunk_dir, cx, cy))
+
+    manifest = {
+        "source": os.path.basename(source_path),
+        "source_mtime": os.path.getmtime(source_path),
+        "world_width": world_width,
+        "world_height": world_height,
+        "chunk_size": chunk_size,
+        "cols": cols,
+        "rows": rows,
+    }
+    with open(os.path.join(chunk_dir, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f)
+    return manifest
+
+
+def _chunks_up_to_date(source_path, chunk_dir, world_width, world_height, chunk_size):
+    try:
+        with open(os.path.join(chunk_dir, MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return (
+        manifest.get("source_mtime") == os.path.getmtime(source_path)
+        and manifest.get("world_width") == world_width
+        and manifest.get("world_height") == world_height
+        and manifest.get("chunk_size") == chunk_size
+    )
+
+
+def prepare_chunks(source_path, chunk_dir, world_width, world_height, chunk_size=CHUNK_SIZE):
+    """Split the map only if the chunk folder is missing or stale."""
+    if not _chunks_up_to_date(source_path, chunk_dir, world_width, world_height, chunk_size):
+        split_map(source_path, chunk_dir, world_width, world_height, chunk_size)
+
+
+class ChunkedMap:
+    """
+    World-map layer streamed from the chunk files split_map() wrote.
+
+    Only chunks that touch the camera viewport (plus a prefetch margin) are
+    loaded and converted; the least recently used off-screen chunks are
+    dropped once the memory budget is exceeded.
+    """
+
+    def __init__(
+        self,
+        chunk_dir,
+        world_width,
+        world_height,
+        chunk_size=CHUNK_SIZE,
+        prefetch_margin=PREFETCH_MARGIN,
+        memory_budget=MEMORY_BUDGET,
+        prefetch_per_frame=PREFETCH_PER_FRAME,
+    ):
+        self.chunk_dir = chunk_dir
+        self.world_width = world_width
+        self.world_height = world_height
+        self.chunk_size = chunk_size
+        self.prefetch_margin = prefetch_margin
+        self.memory_budget = memory_budget
+        self.prefetch_per_frame = prefetch_per_frame
+
+        self.cols = (world_width + chunk_size - 1) // chunk_size
+        self.rows = (world_height + chunk_size - 1) // chunk_size
+
+        # (cx, cy) -> Surface, least recently used first
+        self._chunks: OrderedDict = OrderedDict()
+        self.used_bytes = 0
+        self.loads = 0
+        self.evictions = 0
+
+        self._visible: list[tuple[int, int]] = []
+        self._last_view = None
+
+    @classmethod
+    def open(cls, source_path, world_width, world_height, chunk_dir=CHUNK_DIR, **kwargs):
+        """
+        Build (or reuse) the chunk files for source_path and return a ChunkedMap.
+        Returns None if the map can't be loaded, so the game can fall back
+        to a plain background color.
+        """
+        chunk_size = kwargs.get("chunk_size", CHUNK_SIZE)
+        try:
+            prepare_chunks(source_path, chunk_dir, world_width, world_height, chunk_size)
+        except (OSError, pygame.error) as e:
+            print(f"Could not load world map: {e}")
+            return None
+        return cls(chunk_dir, world_width, world_height, **kwargs)
+
+    # ------------- chunk bookkeeping -------------
+
+    def _chunks_in(self, left, top, right, bottom):
+        """Chunk coords overlapping the world rectangle [left, right) x [top, bottom)."""
+        size = self.chunk_size
+        cx0 = max(0, int(left) // size)
+        cy0 = max(0, int(top) // size)
+        cx1 = min(self.cols - 1, int(right - 1) // size)
+        cy1 = min(self.rows - 1, int(bottom - 1) // size)
+        return [(cx, cy) for cy in range(cy0, cy1 + 1) for cx in range(cx0, cx1 + 1)]
+
+    def _load(self, key):
+        surface = pygame.image.load(_chunk_path(self.chunk_dir, *key))
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        self._chunks[key] = surface
+        self.used_bytes += surface.get_bytesize() * surface.get_width() * surface.get_height()
+        self.loads += 1
+        return surface
+
+    def _evict(self, keep):
+        for key in list(self._chunks):
+            if self.used_bytes <= self.memory_budget:
+                break
+            if key in keep:
+                continue
+            surface = self._chunks.pop(key)
+            self.used_bytes -= surface.get_bytesize() * surface.get_width() * surface.get_height()
+            self.evictions += 1
+
+    def update(self, camera):
+        """Load what the viewport needs, prefetch around it, evict the rest."""
+        screen_w, screen_h = camera.screen.get_size()
+        left, top = camera.offset_x, camera.offset_y
+        right, bottom = left + screen_w, top + screen_h
+
+        self._visible = self._chunks_in(left, top, right, bottom)
+
+        # Visible chunks have to be there this frame
+        for key in self._visible:
+            if key in self._chunks:
+                self._chunks.move_to_end(key)
+            else:
+                self._load(key)
+
+        # Chunks just outside the screen get loaded a few per frame
+        m = self.prefetch_margin
+        wanted = self._chunks_in(left - m, top - m, right + m, bottom + m)
+        budget = self.prefetch_per_frame
+        for key in wanted:
+            if key in self._chunks:
+                self._chunks.move_to_end(key)
+            elif budget > 0:
+                self._load(key)
+                budget -= 1
+
+        self._evict(keep=set(self._visible))
+
+    # ------------- drawing -------------
+
+    def draw(self, screen, camera):
+        """
+        Blit the visible chunks. Call update(camera) first.
+        Returns the screen rects that changed since the last draw.
+        """
+        size = self.chunk_size
+        blits = []
+        for cx, cy in self._visible:
+            surface = self._chunks.get((cx, cy))
+            if surface is not None:
+                pos = camera.world_to_screen(cx * size, cy * size)
+                blits.append((surface, (int(pos[0]), int(pos[1]))))
+        screen.blits(blits, doreturn=False)
+
+        view = (camera.offset_x, camera.offset_y, screen.get_size())
+        if view == self._last_view:
+            return []
+        self._last_view = view
+        return [screen.get_rect()]
+
+    def stats(self) -> dict:
+        return {
+            "loaded": len(self._chunks),
+            "visible": len(self._visible),
+            "used_bytes": self.used_bytes,
+            "memory_budget": self.memory_budget,
+            "loads": self.loads,
+            "evictions": self.evictions,
+        }
+
+
+if __name__ == "__main__":
+    # Pre-split the map offline: python world_map.py
+    pygame.init()
+    info = split_map(MAP_PATH, CHUNK_DIR, WORLD_WIDTH, WORLD_HEIGHT)
+    print(f"Wrote {info['cols'] * info['rows']} chunks to {CHUNK_DIR}")
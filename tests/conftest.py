@@ -0,0 +1,6 @@
+# conftest.py
+import os
+import sys
+
+# The game's modules import each other as top-level modules from "python files"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "python files"))
@@ -0,0 +1,29 @@
+# test_engine.py
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from engine import InputRecording, Simulation, wander_script
+
+
+def test_pauses_do_not_change_the_replay():
+    view = pygame.Surface((1280, 720))
+    live = Simulation(view)
+    recording = InputRecording()
+    for tick, (keys, _actions) in enumerate(wander_script(3000, seed=3).ticks()):
+        if tick % 97 < 13:
+            # The game steps paused behind menus but doesn't record those ticks
+            live.step(keys, paused=True)
+        live.step(keys)
+        recording.record(keys)
+
+    replay = Simulation(view)
+    for keys, _actions in recording.ticks():
+        replay.step(keys)
+
+    assert (live.player.x, live.player.y) == (replay.player.x, replay.player.y)
+    count = len(live.slimes)
+    assert (live.slimes.x[:count] == replay.slimes.x[:count]).all()
+    assert (live.slimes.y[:count] == replay.slimes.y[:count]).all()
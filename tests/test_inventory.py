@@ -0,0 +1,39 @@
+# test_inventory.py
+from inventory import Inventory
+from items import create_item
+
+
+def _inventory_with_goo(max_slots):
+    goo = create_item("slime_goo")
+    inventory = Inventory(max_slots=max_slots)
+    inventory.apply([("add", goo, 1)])
+    return inventory, goo
+
+
+def test_adds_of_one_item_share_the_free_room_of_its_stack():
+    inventory, goo = _inventory_with_goo(max_slots=1)
+    assert not inventory.apply([("add", goo, 98), ("add", goo, 98)])
+    assert inventory.count("slime_goo") == 1
+
+
+def test_failed_batch_changes_nothing():
+    inventory, goo = _inventory_with_goo(max_slots=2)
+    calls = []
+    inventory.subscribe(lambda inv, ops: calls.append(ops))
+    assert not inventory.apply([("add", goo, 98), ("add", goo, 98), ("add", "stick", 1)])
+    assert inventory.count("slime_goo") == 1
+    assert inventory.count("stick") == 0
+    assert calls == []
+
+
+def test_batch_that_fits_is_applied_whole():
+    inventory, goo = _inventory_with_goo(max_slots=2)
+    assert inventory.apply([("add", goo, 98), ("add", goo, 98)])
+    assert inventory.count("slime_goo") == 197
+    assert len(inventory) == 2
+
+
+def test_remove_can_empty_the_stack_a_later_add_counts_on():
+    inventory, goo = _inventory_with_goo(max_slots=1)
+    assert inventory.apply([("remove", "slime_goo", 1), ("add", goo, 98)])
+    assert inventory.count("slime_goo") == 98